@@ -1,14 +1,32 @@
 import logging
 import sys
+import time
 
 from flask import Flask, jsonify
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
+from auth_utils import get_token_cache
+from catalog import get_catalog, sync_shared_generation
+from compression import init_compression
 from config import Config
+from db_pool import is_memory_database, pool_status
 from extensions import db, init_extensions
+from json_provider import configure_json
+from load_test import load_test_command
+from migrations import ensure_schema_current, migrate_command
+from prerequisites import get_graph
+from progress import reconcile_progress_command
 from routes_auth import auth_bp
+from routes_events import events_bp
 from routes_programs import programs_bp
+from routes_terms import terms_bp
 from routes_users import users_bp
-from seed_data import bootstrap_database
+from section_import import import_sections_command
+from seed_data import bootstrap_database, seed_command
+from synthetic_data import generate_dataset_command
+
+logger = logging.getLogger(__name__)
 
 
 def configure_logging():
@@ -29,29 +47,92 @@ def configure_logging():
     root_logger.addHandler(handler)
 
 
-def create_app() -> Flask:
+def warm_caches():
+    """Build the catalog and prerequisite graphs up front.
+
+    Under a preloading server this runs once in the master, so forked workers
+    share the read-only structures copy-on-write instead of each building them.
+    """
+    # Record the shared generation first so the snapshots built below count as current.
+    sync_shared_generation()
+    catalog = get_catalog()
+    for program in catalog.programs:
+        get_graph(program.id)
+
+
+def initialize_database(app: Flask):
+    """Check the schema marker, or migrate and seed when this process owns the database."""
+    if app.config.get("DB_AUTO_BOOTSTRAP") or is_memory_database(db.engine.url):
+        bootstrap_database()
+    else:
+        ensure_schema_current()
+
+
+def create_app(initialize: bool = True) -> Flask:
+    """Build the application.
+
+    ``initialize=False`` skips the schema check and cache warm-up, for CLI
+    commands that create or migrate the database themselves.
+    """
     configure_logging()
     app = Flask(__name__)
     app.config.from_object(Config)
+    configure_json(app)
 
     init_extensions(app)
+    init_compression(app)
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(programs_bp)
     app.register_blueprint(users_bp)
+    app.register_blueprint(terms_bp)
+    app.register_blueprint(events_bp)
+
+    app.cli.add_command(migrate_command)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(import_sections_command)
+    app.cli.add_command(reconcile_progress_command)
+    app.cli.add_command(generate_dataset_command)
+    app.cli.add_command(load_test_command)
+
+    @app.before_request
+    def sync_shared_caches():
+        try:
+            sync_shared_generation(app.config["CACHE_GENERATION_CHECK_SECONDS"])
+        except SQLAlchemyError as exc:
+            # Keep serving the current snapshots; the next check retries.
+            db.session.rollback()
+            logger.warning("Shared cache generation check failed: %s", exc)
 
     @app.route("/health", methods=["GET"])
     def healthcheck():
         return jsonify({"status": "ok"}), 200
 
-    with app.app_context():
-        bootstrap_database()
+    @app.route("/health/auth-cache", methods=["GET"])
+    def auth_cache_stats():
+        return jsonify(get_token_cache().stats()), 200
+
+    @app.route("/health/db", methods=["GET"])
+    def database_health():
+        data = pool_status(db.engine)
+        start = time.perf_counter()
+        try:
+            db.session.execute(text("SELECT 1"))
+        except SQLAlchemyError as exc:
+            logger.warning("Database health check failed: %s", exc)
+            data.update({"status": "error", "error": exc.__class__.__name__})
+            return jsonify(data), 503
+        data.update({"status": "ok", "pingMs": round((time.perf_counter() - start) * 1000, 3)})
+        return jsonify(data), 200
+
+    if initialize:
+        with app.app_context():
+            initialize_database(app)
+            warm_caches()
 
     return app
 
 
-app = create_app()
-
-
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000)
+    # Development server only; production runs gunicorn against wsgi:app.
+    create_app().run(host="0.0.0.0", port=5000)
@@ -1,11 +1,139 @@
+import base64
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from functools import wraps
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional, Tuple
 
 import jwt
 from flask import current_app, g, jsonify, request
+from sqlalchemy import delete, update
 
-from models import User
+from extensions import db
+from models import Program, RefreshSession, User
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class AuthenticatedUser:
+    """Lightweight, cacheable view of the user behind a token.
+
+    Views read identity fields from here; handlers that modify the user load
+    the ORM row explicitly with ``load_current_user``. ``revision`` is the
+    user's revision when the snapshot was read; a cached snapshot is only used
+    while it still matches the row, so writes made by another worker show up
+    on the next request.
+    """
+
+    id: int
+    name: str
+    email: str
+    carne: str
+    program_id: int
+    program_code: Optional[str]
+    program_name: Optional[str]
+    revision: int
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "email": self.email,
+            "carne": self.carne,
+            "program": {
+                "code": self.program_code,
+                "name": self.program_name,
+            },
+        }
+
+
+class TokenCache:
+    """Bounded LRU of verified tokens with per-entry expiry.
+
+    Entries live until the token's ``exp`` or ``ttl`` seconds, whichever comes
+    first. ``invalidate_user`` bumps a per-user generation so every cached token
+    of that user misses on its next use.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, int, dict, AuthenticatedUser]]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[dict, AuthenticatedUser]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, generation, payload, user = entry
+                if expires_at > now and generation == self._generations.get(user.id, 0):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload, user
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, payload: dict, user: AuthenticatedUser):
+        expires_at = min(float(payload.get("exp", 0)), time.time() + self.ttl)
+        with self._lock:
+            generation = self._generations.get(user.id, 0)
+            self._entries[key] = (expires_at, generation, payload, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxSize": self.max_size,
+                "ttlSeconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_token_cache: Optional[TokenCache] = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> TokenCache:
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = TokenCache(
+                    max_size=current_app.config["AUTH_CACHE_SIZE"],
+                    ttl=current_app.config["AUTH_CACHE_TTL_SECONDS"],
+                )
+    return _token_cache
+
+
+def invalidate_cached_user(user_id: int):
+    """Force the next request of ``user_id`` to re-read the user row."""
+    get_token_cache().invalidate_user(user_id)
 
 
 def _decode_token(token: str) -> Optional[dict]:
@@ -22,7 +150,35 @@ def _decode_token(token: str) -> Optional[dict]:
         return None
 
 
-def generate_token(user: User, expires_in_hours: int = 12) -> str:
+def _load_user_snapshot(user_id: int) -> Optional[AuthenticatedUser]:
+    row = (
+        db.session.query(
+            User.id,
+            User.name,
+            User.email,
+            User.carne,
+            User.program_id,
+            Program.code,
+            Program.name,
+            User.revision,
+        )
+        .outerjoin(Program, User.program_id == Program.id)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if row is None:
+        return None
+    return AuthenticatedUser(*row)
+
+
+def load_current_user() -> Optional[User]:
+    """Return the ORM row of the authenticated user, for handlers that write to it."""
+    return db.session.get(User, g.current_user.id)
+
+
+def generate_token(user: User, expires_in_hours: Optional[float] = None) -> str:
+    if expires_in_hours is None:
+        expires_in_hours = current_app.config["ACCESS_TOKEN_TTL_HOURS"]
     now = datetime.now(timezone.utc)
     payload = {
         "sub": str(user.id),
@@ -37,6 +193,99 @@ def generate_token(user: User, expires_in_hours: int = 12) -> str:
     )
 
 
+def _refresh_signature(session_id: int, counter: int, user_id: int, password_hash: str) -> str:
+    # The password hash is folded in, so changing (or rehashing) a password
+    # revokes every refresh token issued before it.
+    key = hmac.new(
+        current_app.config["JWT_SECRET_KEY"].encode("utf-8"), b"refresh-token", hashlib.sha256
+    ).digest()
+    message = f"{session_id}.{counter}.{user_id}.{password_hash}".encode("utf-8")
+    digest = hmac.new(key, message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+
+def _refresh_token(session_id: int, counter: int, user: User) -> str:
+    signature = _refresh_signature(session_id, counter, user.id, user.password_hash)
+    return f"{session_id}.{counter}.{signature}"
+
+
+def _refresh_expiry() -> datetime:
+    return datetime.utcnow() + timedelta(days=current_app.config["REFRESH_TOKEN_TTL_DAYS"])
+
+
+def start_refresh_session(user: User) -> str:
+    """Open a refresh chain for a new sign-in and return its first token.
+
+    Opaque ``<session id>.<counter>.<signature>``, verified without the KDF. Runs
+    in the caller's transaction; the user's expired chains are dropped on the way.
+    """
+    db.session.execute(
+        delete(RefreshSession).where(
+            RefreshSession.user_id == user.id, RefreshSession.expires_at <= datetime.utcnow()
+        )
+    )
+    session = RefreshSession(user_id=user.id, counter=0, expires_at=_refresh_expiry())
+    db.session.add(session)
+    db.session.flush()
+    return _refresh_token(session.id, 0, user)
+
+
+def _verify_refresh_token(token: str) -> Optional[Tuple[RefreshSession, User, int]]:
+    """The chain, user and counter a genuine, unexpired token names (the counter may be stale)."""
+    try:
+        session_id, counter, signature = token.split(".")
+        session_id, counter = int(session_id), int(counter)
+    except ValueError:
+        return None
+
+    session = db.session.get(RefreshSession, session_id)
+    if session is None or session.expires_at <= datetime.utcnow():
+        return None
+    user = db.session.get(User, session.user_id)
+    if user is None:
+        return None
+    expected = _refresh_signature(session_id, counter, user.id, user.password_hash)
+    if not hmac.compare_digest(expected, signature):
+        return None
+    return session, user, counter
+
+
+def rotate_refresh_token(token: str) -> Optional[Tuple[User, str]]:
+    """Consume a refresh token; return its user and the chain's next token.
+
+    Presenting an already consumed token means it was copied, so the whole
+    chain is revoked. Runs in the caller's transaction.
+    """
+    verified = _verify_refresh_token(token)
+    if verified is None:
+        return None
+    session, user, counter = verified
+    if counter != session.counter:
+        logger.warning("Refresh token reused for user %s; revoking its session", user.id)
+        db.session.delete(session)
+        return None
+
+    # Compare-and-set, so two concurrent refreshes with one token cannot both win.
+    advanced = db.session.execute(
+        update(RefreshSession)
+        .where(RefreshSession.id == session.id, RefreshSession.counter == counter)
+        .values(counter=counter + 1, expires_at=_refresh_expiry())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not advanced:
+        return None
+    return user, _refresh_token(session.id, counter + 1, user)
+
+
+def revoke_refresh_token(token: str) -> bool:
+    """End the chain a refresh token belongs to (logout). Runs in the caller's transaction."""
+    verified = _verify_refresh_token(token)
+    if verified is None:
+        return False
+    db.session.delete(verified[0])
+    return True
+
+
 def auth_required(func: Callable):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -45,15 +294,31 @@ def auth_required(func: Callable):
             return jsonify({"message": "Authorization header missing or invalid"}), 401
 
         token = auth_header.split(" ", 1)[1]
-        payload = _decode_token(token)
-        if not payload:
-            return jsonify({"message": "Invalid or expired token"}), 401
+        cache = get_token_cache()
+        cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        cached = cache.get(cache_key)
+        if cached:
+            payload, user = cached
+            # Per request anyway for the ETag; reused there through ``g.user_revision``.
+            revision = User.current_revision(user.id)
+            if revision != user.revision:
+                user = _load_user_snapshot(user.id)
+                if not user:
+                    return jsonify({"message": "User not found"}), 404
+                cache.put(cache_key, payload, user)
+        else:
+            payload = _decode_token(token)
+            if not payload:
+                return jsonify({"message": "Invalid or expired token"}), 401
 
-        user = User.query.get(int(payload["sub"]))
-        if not user:
-            return jsonify({"message": "User not found"}), 404
+            user = _load_user_snapshot(int(payload["sub"]))
+            if not user:
+                return jsonify({"message": "User not found"}), 404
+            cache.put(cache_key, payload, user)
 
+        g.token_payload = payload
         g.current_user = user
+        g.user_revision = user.revision
         return func(*args, **kwargs)
 
     return wrapper
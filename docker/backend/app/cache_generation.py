@@ -0,0 +1,62 @@
+"""Cross-process invalidation for the in-memory catalog, section and event snapshots.
+
+Session events invalidate the snapshots of the process that committed a write;
+other gunicorn workers and CLI commands (``import-sections``,
+``generate-dataset``) never hear about it. Every such write therefore also
+increments the ``cache_generation`` row in its own transaction, and each process
+re-reads that row at most every ``CACHE_GENERATION_CHECK_SECONDS`` and drops its
+snapshots when the value moved.
+"""
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import CacheGeneration
+
+logger = logging.getLogger(__name__)
+
+_BUMPED = "cache_generation_bumped"
+
+
+def bump_generation(session):
+    """Increment the shared generation in ``session``'s transaction, once per transaction.
+
+    Runs on the session's connection directly, so it is safe from ``after_flush``.
+    """
+    if session.info.get(_BUMPED):
+        return
+    session.info[_BUMPED] = True
+    session.connection().execute(
+        update(CacheGeneration.__table__)
+        .where(CacheGeneration.id == 1)
+        .values(generation=CacheGeneration.generation + 1)
+    )
+
+
+def current_generation() -> int:
+    return (
+        db.session.execute(
+            select(CacheGeneration.generation).where(CacheGeneration.id == 1)
+        ).scalar()
+        or 0
+    )
+
+
+def ensure_generation_row():
+    """Insert the counter row; used by the schema migration that adds the table."""
+    if db.session.get(CacheGeneration, 1) is None:
+        db.session.add(CacheGeneration(id=1, generation=0))
+
+
+@event.listens_for(Session, "after_commit")
+def _reset_after_commit(session):
+    session.info.pop(_BUMPED, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_after_rollback(session):
+    session.info.pop(_BUMPED, None)
@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import hashlib
+from bisect import bisect_left, bisect_right
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from flask import Response, current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import event_index
+import prerequisites
+import section_index
+from cache_generation import bump_generation, current_generation
+from compression import compress, negotiate_encoding
+from models import Course, CourseBlock, Program
+
+logger = logging.getLogger(__name__)
+
+_CATALOG_MODELS = (Program, CourseBlock, Course)
+
+_catalog: Optional["Catalog"] = None
+_generation = 0
+_catalog_lock = threading.Lock()
+
+# Last shared generation this process saw, and when it last looked.
+_shared_generation: Optional[int] = None
+_shared_checked_at = float("-inf")
+
+
+@dataclass(frozen=True, slots=True)
+class CourseRecord:
+    id: int
+    code: str
+    name: str
+    credits: int
+    hours: int
+    requisitos: Optional[str]
+    correquisitos: Optional[str]
+    default_status: Optional[str]
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "code": self.code,
+            "name": self.name,
+            "credits": self.credits,
+            "hours": self.hours,
+            "requirements": self.requisitos,
+            "corequisites": self.correquisitos,
+            "defaultStatus": self.default_status,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class BlockRecord:
+    id: int
+    block_number: int
+    # Sorted by course code.
+    courses: Tuple[CourseRecord, ...]
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "blockNumber": self.block_number,
+            "courses": [course.to_dict() for course in self.courses],
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ProgramRecord:
+    id: int
+    code: str
+    name: str
+    jornada: Optional[str]
+    sedes: Tuple[str, ...]
+    degree: Optional[str]
+    last_updated: Optional[str]
+    total_credits: int
+    number_of_semesters: int
+    # Sorted by block number.
+    blocks: Tuple[BlockRecord, ...]
+    course_ids: FrozenSet[int]
+
+    def to_dict(self, include_blocks: bool = False) -> Dict:
+        data = {
+            "id": self.id,
+            "code": self.code,
+            "name": self.name,
+            "jornada": self.jornada,
+            "sedes": list(self.sedes),
+            "degree": self.degree,
+            "lastUpdated": self.last_updated,
+            "totalCredits": self.total_credits,
+            "numberOfSemesters": self.number_of_semesters,
+        }
+        if include_blocks:
+            data["blocks"] = [block.to_dict() for block in self.blocks]
+        return data
+
+
+NameKey = Tuple[str, str]
+
+
+def _name_key(record: ProgramRecord) -> NameKey:
+    return (record.name.casefold(), record.code)
+
+
+@dataclass(frozen=True, slots=True)
+class Catalog:
+    """Immutable snapshot of every program with its JSON bodies pre-serialized."""
+
+    generation: int
+    # Content digest; identical across processes that loaded the same data.
+    version: str
+    programs: Tuple[ProgramRecord, ...]
+    by_code: Dict[str, ProgramRecord]
+    by_id: Dict[int, ProgramRecord]
+    # (casefolded name, code) for every program, sorted; the keyset and prefix index.
+    name_keys: Tuple[NameKey, ...]
+    # Aligned with ``name_keys``.
+    programs_by_name: Tuple[ProgramRecord, ...]
+    summaries_json: bytes
+    detail_json: Dict[str, bytes]
+    # (body key, encoding) -> compressed body, filled on first request for each.
+    encoded: Dict[Tuple[str, str], bytes] = field(default_factory=dict, compare=False, repr=False)
+
+    def program_response(self, code: str) -> Optional[Response]:
+        body = self.detail_json.get(code)
+        if body is None:
+            return None
+        return self._negotiated_response(f"program:{code}", body)
+
+    def summaries_response(self) -> Response:
+        return self._negotiated_response("summaries", self.summaries_json)
+
+    def search_programs(
+        self,
+        limit: int,
+        after: Optional[NameKey] = None,
+        prefix: Optional[str] = None,
+        jornada: Optional[str] = None,
+        sede: Optional[str] = None,
+        degree: Optional[str] = None,
+    ) -> Tuple[List[ProgramRecord], Optional[NameKey]]:
+        """Return up to ``limit`` programs ordered by name, plus the key to resume after.
+
+        ``after`` is the last key of the previous page. A name ``prefix`` narrows
+        the scan to its range of the sorted index; the remaining filters compare
+        case-insensitively. The returned key is None on the last page.
+        """
+        keys = self.name_keys
+        prefix = prefix.casefold() if prefix else None
+        start = bisect_left(keys, (prefix,)) if prefix else 0
+        if after is not None:
+            start = max(start, bisect_right(keys, after))
+
+        jornada = jornada.casefold() if jornada else None
+        sede = sede.casefold() if sede else None
+        degree = degree.casefold() if degree else None
+
+        matches: List[ProgramRecord] = []
+        for position in range(start, len(keys)):
+            if prefix and not keys[position][0].startswith(prefix):
+                break
+            record = self.programs_by_name[position]
+            if jornada and (record.jornada or "").casefold() != jornada:
+                continue
+            if degree and (record.degree or "").casefold() != degree:
+                continue
+            if sede and sede not in (value.casefold() for value in record.sedes):
+                continue
+            if len(matches) == limit:
+                return matches, _name_key(matches[-1])
+            matches.append(record)
+        return matches, None
+
+    def _negotiated_response(self, key: str, body: bytes) -> Response:
+        """Serve ``body`` in the client's preferred encoding, compressing it once per snapshot."""
+        encoding = negotiate_encoding(len(body))
+        if encoding is None:
+            return _json_response(body)
+        cache_key = (key, encoding)
+        encoded = self.encoded.get(cache_key)
+        if encoded is None:
+            # Concurrent first requests may both compress; the results are identical.
+            encoded = self.encoded[cache_key] = compress(body, encoding, precompress=True)
+        response = _json_response(encoded)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+def _json_response(body: bytes) -> Response:
+    return Response(body, status=200, mimetype="application/json")
+
+
+def _dumps(data) -> bytes:
+    # Match the compact body that jsonify produces outside debug mode.
+    return current_app.json.dumps_bytes(data) + b"\n"
+
+
+def _build_catalog(generation: int) -> Catalog:
+    programs = Program.query.order_by(Program.name.asc(), Program.id.asc()).all()
+    blocks = CourseBlock.query.order_by(CourseBlock.block_number, CourseBlock.id).all()
+    courses = Course.query.order_by(Course.code).all()
+
+    courses_by_block: Dict[int, list] = {}
+    for course in courses:
+        courses_by_block.setdefault(course.block_id, []).append(
+            CourseRecord(
+                id=course.id,
+                code=course.code,
+                name=course.name,
+                credits=course.credits,
+                hours=course.hours,
+                requisitos=course.requisitos,
+                correquisitos=course.correquisitos,
+                default_status=course.default_status,
+            )
+        )
+
+    blocks_by_program: Dict[int, list] = {}
+    for block in blocks:
+        blocks_by_program.setdefault(block.program_id, []).append(
+            BlockRecord(
+                id=block.id,
+                block_number=block.block_number,
+                courses=tuple(courses_by_block.get(block.id, ())),
+            )
+        )
+
+    records = tuple(
+        ProgramRecord(
+            id=program.id,
+            code=program.code,
+            name=program.name,
+            jornada=program.jornada,
+            sedes=tuple(program.sedes),
+            degree=program.degree,
+            last_updated=program.last_updated.isoformat() if program.last_updated else None,
+            total_credits=program.total_credits,
+            number_of_semesters=program.number_of_semesters,
+            blocks=tuple(blocks_by_program.get(program.id, ())),
+            course_ids=frozenset(
+                course.id
+                for block in blocks_by_program.get(program.id, ())
+                for course in block.courses
+            ),
+        )
+        for program in programs
+    )
+
+    summaries_json = _dumps([record.to_dict() for record in records])
+    detail_json = {record.code: _dumps(record.to_dict(include_blocks=True)) for record in records}
+
+    programs_by_name = tuple(sorted(records, key=_name_key))
+
+    digest = hashlib.sha256(summaries_json)
+    for code in sorted(detail_json):
+        digest.update(detail_json[code])
+
+    return Catalog(
+        generation=generation,
+        version=digest.hexdigest()[:16],
+        programs=records,
+        by_code={record.code: record for record in records},
+        by_id={record.id: record for record in records},
+        name_keys=tuple(_name_key(record) for record in programs_by_name),
+        programs_by_name=programs_by_name,
+        summaries_json=summaries_json,
+        detail_json=detail_json,
+    )
+
+
+def get_catalog() -> Catalog:
+    """Return the current catalog snapshot, rebuilding it after an invalidation."""
+    catalog = _catalog
+    if catalog is not None and catalog.generation == _generation:
+        return catalog
+    return _rebuild()
+
+
+def _rebuild() -> Catalog:
+    global _catalog
+    with _catalog_lock:
+        if _catalog is not None and _catalog.generation == _generation:
+            return _catalog
+        generation = _generation
+        catalog = _build_catalog(generation)
+        _catalog = catalog
+    logger.info(
+        "Built program catalog %s (%d programs, generation %d)",
+        catalog.version,
+        len(catalog.programs),
+        generation,
+    )
+    return catalog
+
+
+def get_program(program_id: int) -> Optional[ProgramRecord]:
+    """Look up a program, rebuilding the snapshot once when it is not there.
+
+    A program committed by another process shows up here before the shared
+    generation check has caught up with it.
+    """
+    catalog = get_catalog()
+    record = catalog.by_id.get(program_id)
+    if record is not None:
+        return record
+    global _generation
+    with _catalog_lock:
+        if _catalog is catalog:
+            _generation += 1
+    return get_catalog().by_id.get(program_id)
+
+
+def sync_shared_generation(max_age: float = 0.0):
+    """Drop every snapshot when another process has written catalog, section or event data.
+
+    Reads the shared generation at most once every ``max_age`` seconds.
+    """
+    global _shared_generation, _shared_checked_at
+    now = time.monotonic()
+    if now - _shared_checked_at < max_age:
+        return
+    _shared_checked_at = now
+    generation = current_generation()
+    if generation == _shared_generation:
+        return
+    if _shared_generation is not None:
+        logger.info("Shared cache generation moved to %d; dropping snapshots", generation)
+    invalidate()
+    _shared_generation = generation
+
+
+def invalidate(program_ids: Optional[Set[int]] = None):
+    """Discard the catalog snapshot, affected prerequisite graphs, section and event indexes.
+
+    Session events call this automatically for ORM writes; bulk Core inserts
+    that bypass the unit of work must call it themselves.
+    """
+    global _generation
+    with _catalog_lock:
+        _generation += 1
+    if program_ids:
+        for program_id in program_ids:
+            prerequisites.invalidate(program_id)
+    else:
+        prerequisites.invalidate()
+    # Section records carry course names and credits; event records carry program codes.
+    section_index.invalidate()
+    event_index.invalidate()
+
+
+def _changed_program_ids(session) -> Set[Optional[int]]:
+    changed = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, Program):
+            changed.add(instance.id)
+        elif isinstance(instance, _CATALOG_MODELS):
+            changed.add(instance.program_id)
+    return changed
+
+
+def mark_catalog_changed(session, program_ids: Optional[Set[Optional[int]]] = None):
+    """Invalidate the catalog once ``session`` commits (for writes that bypass the ORM).
+
+    ``None`` (or a ``None`` member) stands for every program.
+    """
+    session.info.setdefault("catalog_changes", set()).update(program_ids or {None})
+    bump_generation(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_catalog_writes(session, flush_context):
+    changed = _changed_program_ids(session)
+    if changed:
+        mark_catalog_changed(session, changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    changed = session.info.pop("catalog_changes", None)
+    if changed:
+        invalidate(None if None in changed else changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_writes(session):
+    session.info.pop("catalog_changes", None)
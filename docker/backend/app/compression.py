@@ -0,0 +1,102 @@
+"""Content-Encoding negotiation (brotli when installed, gzip) for JSON responses."""
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import current_app, has_request_context, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/html"}
+
+# Server preference when the client weighs encodings equally.
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Bodies compressed once and kept (the catalog) get the slowest, smallest settings.
+_PRECOMPRESS_GZIP_LEVEL = 9
+_PRECOMPRESS_BROTLI_QUALITY = 11
+
+
+def negotiate_encoding(size: Optional[int] = None) -> Optional[str]:
+    """Pick the client's preferred supported encoding, or None to send identity.
+
+    Bodies smaller than ``COMPRESS_MIN_SIZE`` are not worth the framing overhead.
+    """
+    if not has_request_context():
+        return None
+    if size is not None and size < current_app.config["COMPRESS_MIN_SIZE"]:
+        return None
+    return request.accept_encodings.best_match(SUPPORTED_ENCODINGS)
+
+
+def compress(body: bytes, encoding: str, precompress: bool = False) -> bytes:
+    config = current_app.config
+    if encoding == "br":
+        quality = _PRECOMPRESS_BROTLI_QUALITY if precompress else config["BROTLI_QUALITY"]
+        return brotli.compress(body, quality=quality)
+    if encoding == "gzip":
+        level = _PRECOMPRESS_GZIP_LEVEL if precompress else config["COMPRESS_LEVEL"]
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+def _compress_chunks(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Compress a streamed body chunk by chunk, flushing so each chunk still goes out."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=current_app.config["BROTLI_QUALITY"])
+
+        def encode(chunk: bytes) -> bytes:
+            return compressor.process(chunk) + compressor.flush()
+
+        finish = compressor.finish
+    else:
+        # wbits=31 writes the gzip header and trailer.
+        compressor = zlib.compressobj(current_app.config["COMPRESS_LEVEL"], zlib.DEFLATED, 31)
+
+        def encode(chunk: bytes) -> bytes:
+            return compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        finish = compressor.flush
+
+    def generate():
+        for chunk in chunks:
+            yield encode(chunk)
+        yield finish()
+
+    return generate()
+
+
+def init_compression(app):
+    """Compress eligible responses after the view (and ``conditional``) have run."""
+
+    @app.after_request
+    def compress_response(response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+        response.vary.add("Accept-Encoding")
+        if (
+            "Content-Encoding" in response.headers
+            or response.status_code != 200
+            or response.direct_passthrough
+        ):
+            return response
+
+        if response.is_streamed:
+            encoding = negotiate_encoding()
+            if encoding is None:
+                return response
+            response.response = _compress_chunks(response.response, encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            encoding = negotiate_encoding(len(body))
+            if encoding is None:
+                return response
+            response.set_data(compress(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+        return response
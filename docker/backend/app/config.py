@@ -17,6 +17,11 @@ def _build_database_uri() -> str:
     if all([host, name, user, password]):
         return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{name}"
 
+    # Single-node deployments: one SQLite file shared by every worker (WAL mode).
+    sqlite_path = os.getenv("SQLITE_PATH")
+    if sqlite_path:
+        return f"sqlite:///{os.path.abspath(sqlite_path)}"
+
     # Fall back to an in-memory SQLite database to keep the app bootable without configuration.
     return "sqlite:///:memory:"
 
@@ -27,3 +32,45 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "please-change-me")
     CORS_ALLOWED_ORIGINS: str = os.getenv("CORS_ALLOWED_ORIGINS", "*")
+    # Migrate and seed at startup instead of requiring `python manage.py seed`.
+    # Always on for the in-memory SQLite fallback, which starts empty in every process.
+    DB_AUTO_BOOTSTRAP: bool = os.getenv("DB_AUTO_BOOTSTRAP", "false").lower() == "true"
+    # Connection pool (ignored for the in-memory SQLite fallback).
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Behind PgBouncer in transaction mode: hold no idle connections in-process.
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+    # Per-connection pragmas for file-backed SQLite (SQLITE_PATH or a sqlite DATABASE_URL).
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    # "auto" uses orjson when installed; "stdlib" forces the standard json module.
+    JSON_PROVIDER: str = os.getenv("JSON_PROVIDER", "auto").lower()
+    # Response compression; the catalog is precompressed once at maximum settings.
+    COMPRESS_MIN_SIZE: int = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_LEVEL: int = int(os.getenv("COMPRESS_LEVEL", "6"))
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", "5"))
+    # Werkzeug hash method with every parameter spelled out ("scrypt:N:r:p" or
+    # "pbkdf2:sha256:iterations"); hashes made with anything else are upgraded at login.
+    PASSWORD_HASH_METHOD: str = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    # KDF processes per server worker; 0 hashes on the request thread.
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "1"))
+    # Hashes a worker runs or queues at once; beyond that callers wait, then get a 503.
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "4"))
+    PASSWORD_HASH_WAIT_SECONDS: float = float(os.getenv("PASSWORD_HASH_WAIT_SECONDS", "5"))
+    ACCESS_TOKEN_TTL_HOURS: float = float(os.getenv("ACCESS_TOKEN_TTL_HOURS", "12"))
+    REFRESH_TOKEN_TTL_DAYS: float = float(os.getenv("REFRESH_TOKEN_TTL_DAYS", "30"))
+    AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", "4096"))
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+    EXPOSE_QUERY_COUNT: bool = os.getenv("EXPOSE_QUERY_COUNT", "false").lower() == "true"
+    SCHEDULE_SEARCH_BUDGET_MS: int = int(os.getenv("SCHEDULE_SEARCH_BUDGET_MS", "250"))
+    SCHEDULE_CACHE_SIZE: int = int(os.getenv("SCHEDULE_CACHE_SIZE", "4096"))
+    # How often each process re-reads the shared cache generation (0 checks every request).
+    CACHE_GENERATION_CHECK_SECONDS: float = float(os.getenv("CACHE_GENERATION_CHECK_SECONDS", "2"))
+    # IANA zone of the campus; "today" for events follows it, not the server clock.
+    EVENTS_TIMEZONE: str = os.getenv("EVENTS_TIMEZONE", "America/Costa_Rica")
+    SCHEDULE_SUGGESTIONS_MAX: int = int(os.getenv("SCHEDULE_SUGGESTIONS_MAX", "10"))
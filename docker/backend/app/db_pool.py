@@ -0,0 +1,128 @@
+"""Connection pool settings and per-process pool statistics."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+def is_memory_database(url) -> bool:
+    """True for SQLite databases that live only inside their one connection."""
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+class PoolStats:
+    """Checkout counters for one pool: how often and how long callers waited."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avgWaitMs": round(self.total_wait / self.checkouts * 1000, 3)
+                if self.checkouts
+                else 0.0,
+                "maxWaitMs": round(self.max_wait * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times each checkout, including waits for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return connection
+
+
+def engine_options(config) -> Dict:
+    """Build ``SQLALCHEMY_ENGINE_OPTIONS`` from the ``DB_POOL_*`` settings.
+
+    The in-memory SQLite fallback keeps Flask-SQLAlchemy's single static
+    connection. With ``DB_PGBOUNCER`` the pooler owns the server connections, so
+    each checkout opens a fresh client connection instead of holding idle ones.
+    """
+    if is_memory_database(make_url(config["SQLALCHEMY_DATABASE_URI"])):
+        return {}
+    if config.get("DB_PGBOUNCER"):
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+
+
+def configure_sqlite(engine, config):
+    """Apply the ``SQLITE_*`` pragmas to every new connection of a file-backed SQLite engine.
+
+    WAL lets readers in other workers proceed while one writer commits;
+    ``busy_timeout`` makes a second writer wait for the lock instead of failing.
+    """
+    if engine.dialect.name != "sqlite" or is_memory_database(engine.url):
+        return
+
+    pragmas = [
+        ("journal_mode", config["SQLITE_JOURNAL_MODE"]),
+        ("synchronous", config["SQLITE_SYNCHRONOUS"]),
+        ("mmap_size", int(config["SQLITE_MMAP_SIZE"])),
+        ("busy_timeout", int(config["SQLITE_BUSY_TIMEOUT_MS"])),
+    ]
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def pool_status(engine) -> Dict:
+    pool = engine.pool
+    data: Dict = {"poolClass": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        data.update(
+            {
+                "size": pool.size(),
+                "checkedOut": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        data.update(pool.stats.snapshot())
+    return data
@@ -0,0 +1,221 @@
+"""In-memory timeline of academic events, per program and global.
+
+Events are loaded with one query into an immutable snapshot of date-sorted
+arrays: one for global events (no program) and one per program. A program's
+view is its own array merged with the global one, so "the next ten events from
+today" is two bisections and a short merge instead of an OR query over the
+whole history.
+"""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import logging
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from flask import current_app
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from cache_generation import bump_generation
+from extensions import db
+from models import AcademicEvent, Program
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class EventRecord:
+    id: int
+    title: str
+    description: Optional[str]
+    event_date: date
+    severity: str
+    program_code: Optional[str]
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "date": self.event_date.isoformat(),
+            "severity": self.severity,
+            "programCode": self.program_code,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Timeline:
+    """Events sorted by (date, id), with the sort keys in a parallel array."""
+
+    keys: Tuple[Tuple[date, int], ...]
+    events: Tuple[EventRecord, ...]
+
+    def window(self, start: Optional[date], end: Optional[date]) -> Iterator[EventRecord]:
+        """Events dated in [start, end]; either bound may be open."""
+        first = 0 if start is None else bisect_left(self.keys, (start,))
+        for position in range(first, len(self.events)):
+            record = self.events[position]
+            if end is not None and record.event_date > end:
+                return
+            yield record
+
+
+_EMPTY = Timeline(keys=(), events=())
+
+
+@dataclass(frozen=True, slots=True)
+class EventIndex:
+    # Content digest; identical across processes that loaded the same rows.
+    version: str
+    global_events: Timeline
+    by_program: Dict[int, Timeline]
+
+    def between(
+        self,
+        program_id: Optional[int],
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        limit: Optional[int] = None,
+    ) -> List[EventRecord]:
+        """Global events plus ``program_id``'s events dated in [start, end], soonest first."""
+        events = self.global_events.window(start, end)
+        program = self.by_program.get(program_id) if program_id is not None else None
+        if program is not None:
+            events = heapq.merge(
+                events,
+                program.window(start, end),
+                key=lambda record: (record.event_date, record.id),
+            )
+        return list(islice(events, limit))
+
+    def upcoming(self, program_id: Optional[int], today: date, limit: int) -> List[EventRecord]:
+        return self.between(program_id, start=today, limit=limit)
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def campus_today() -> date:
+    """Today's date in ``EVENTS_TIMEZONE``; the server clock is usually UTC."""
+    return datetime.now(_zone(current_app.config["EVENTS_TIMEZONE"])).date()
+
+
+_index: Optional[EventIndex] = None
+_generation = 0
+_index_lock = threading.Lock()
+
+
+def _timeline(records: List[EventRecord]) -> Timeline:
+    records.sort(key=lambda record: (record.event_date, record.id))
+    return Timeline(
+        keys=tuple((record.event_date, record.id) for record in records),
+        events=tuple(records),
+    )
+
+
+def _build() -> EventIndex:
+    rows = db.session.execute(
+        select(
+            AcademicEvent.id,
+            AcademicEvent.title,
+            AcademicEvent.description,
+            AcademicEvent.event_date,
+            AcademicEvent.severity,
+            AcademicEvent.program_id,
+            Program.code,
+        ).outerjoin(Program, AcademicEvent.program_id == Program.id)
+    )
+
+    global_records: List[EventRecord] = []
+    program_records: Dict[int, List[EventRecord]] = {}
+    for event_id, title, description, event_date, severity, program_id, program_code in rows:
+        record = EventRecord(event_id, title, description, event_date, severity, program_code)
+        if program_id is None:
+            global_records.append(record)
+        else:
+            program_records.setdefault(program_id, []).append(record)
+
+    global_events = _timeline(global_records)
+    by_program = {
+        program_id: _timeline(records) for program_id, records in program_records.items()
+    }
+
+    digest = hashlib.sha256()
+    for program_id, timeline in sorted(by_program.items()):
+        digest.update(f"{program_id}:{timeline.events!r}".encode("utf-8"))
+    digest.update(repr(global_events.events).encode("utf-8"))
+
+    return EventIndex(
+        version=digest.hexdigest()[:16],
+        global_events=global_events,
+        by_program=by_program,
+    )
+
+
+def get_event_index() -> EventIndex:
+    """Return the event index, loading it on first use and after invalidation."""
+    index = _index
+    if index is not None:
+        return index
+    return _rebuild()
+
+
+def _rebuild() -> EventIndex:
+    global _index
+    with _index_lock:
+        if _index is not None:
+            return _index
+        generation = _generation
+        index = _build()
+        # A write that committed while we were loading leaves this snapshot stale.
+        if generation == _generation:
+            _index = index
+        logger.info(
+            "Built event index (%d global, %d programs, version %s)",
+            len(index.global_events.events),
+            len(index.by_program),
+            index.version,
+        )
+    return index
+
+
+def invalidate():
+    global _index, _generation
+    _generation += 1
+    _index = None
+
+
+def mark_events_changed(session):
+    """Invalidate the index once ``session`` commits (for writes that bypass the ORM)."""
+    session.info["academic_events_changed"] = True
+    bump_generation(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_event_writes(session, flush_context):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, AcademicEvent):
+            mark_events_changed(session)
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("academic_events_changed", False):
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_tracked_events(session):
+    session.info.pop("academic_events_changed", None)
@@ -1,8 +1,51 @@
+from flask import g, has_request_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from db_pool import configure_sqlite, engine_options
 
 db = SQLAlchemy()
 
+QUERY_COUNT_HEADER = "X-SQL-Queries"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.sql_query_count = g.get("sql_query_count", 0) + 1
+
+
+def query_count() -> int:
+    """Return the number of SQL statements executed so far in the current request."""
+    return g.get("sql_query_count", 0)
+
+
+def init_query_count_header(app):
+    """Report each response's SQL statement count in ``QUERY_COUNT_HEADER``."""
+
+    @app.after_request
+    def add_query_count_header(response):
+        response.headers[QUERY_COUNT_HEADER] = str(query_count())
+        return response
+
+
+def upsert_insert(table):
+    """Return an INSERT for ``table`` that supports ``on_conflict_do_update``.
+
+    Returns None on databases without ``INSERT ... ON CONFLICT`` so callers can
+    fall back to a select-then-write path.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(table)
+
 
 def init_extensions(app):
     """Initialize Flask extensions."""
@@ -10,5 +53,11 @@ def init_extensions(app):
     CORS(
         app,
         resources={r"/*": {"origins": cors_origins.split(",") if cors_origins != "*" else "*"}},
+        expose_headers=["ETag", QUERY_COUNT_HEADER],
     )
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config))
     db.init_app(app)
+    with app.app_context():
+        configure_sqlite(db.engine, app.config)
+    if app.config.get("EXPOSE_QUERY_COUNT"):
+        init_query_count_header(app)
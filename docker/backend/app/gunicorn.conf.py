@@ -0,0 +1,56 @@
+"""Gunicorn settings; every value can be overridden from the environment."""
+import multiprocessing
+import os
+
+from sqlalchemy.engine import make_url
+
+from config import Config
+from db_pool import is_memory_database
+
+
+def _available_cores() -> int:
+    # Respect CPU affinity/cpusets (containers) where the platform exposes it.
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return multiprocessing.cpu_count()
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+
+# Request handlers mostly wait on the database, so each worker also runs a few
+# threads. The classic (2 x cores) + 1 rule keeps every core busy.
+workers = int(os.getenv("WEB_CONCURRENCY", _available_cores() * 2 + 1))
+if is_memory_database(make_url(Config.SQLALCHEMY_DATABASE_URI)):
+    # The in-memory fallback is private to one process: forked workers would
+    # each write to their own copy and serve divergent data. Scale with threads.
+    workers = 1
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+
+# Build the app (and its catalog caches) once in the master before forking.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    """Drop pooled connections inherited from the master; sockets must not be shared."""
+    if not preload_app:
+        return
+
+    from extensions import db
+    from wsgi import app
+
+    with app.app_context():
+        if is_memory_database(db.engine.url):
+            # The in-memory database lives in its one connection; keep the copy.
+            return
+        db.engine.dispose(close=False)
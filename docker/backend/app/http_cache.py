@@ -0,0 +1,75 @@
+from functools import wraps
+from typing import Callable
+
+from flask import g, make_response, request
+
+from cache_generation import current_generation
+from catalog import get_catalog
+from event_index import campus_today, get_event_index
+from models import User
+from section_index import get_term_sections
+
+
+def catalog_etag() -> str:
+    return f"c-{get_catalog().version}"
+
+
+def term_sections_etag() -> str:
+    index = get_term_sections(request.view_args["term"])
+    return f"s-{index.version}"
+
+
+def user_etag() -> str:
+    """ETag for per-user views: changes with the user's revision or the catalog."""
+    user_id = g.current_user.id
+    # ``auth_required`` has just read the revision, checking its cached snapshot.
+    revision = g.get("user_revision")
+    if revision is None:
+        revision = User.current_revision(user_id)
+    return f"u{user_id}-r{revision}-c{get_catalog().version}"
+
+
+def events_etag() -> str:
+    # Open-ended windows start at today, so the campus date is part of the tag.
+    return f"e-{get_event_index().version}-d{campus_today().isoformat()}"
+
+
+def user_schedule_etag() -> str:
+    """ETag for per-user views that embed section data.
+
+    Section imports change those views without touching any user's revision, and
+    may come from another process, so the shared cache generation is part of the tag.
+    """
+    return f"{user_etag()}-g{current_generation()}"
+
+
+def user_events_etag() -> str:
+    """ETag for per-user views that also embed the schedule and upcoming events."""
+    return f"{user_schedule_etag()}-{events_etag()}"
+
+
+def conditional(etag_func: Callable[[], str], cache_control: str = "private, no-cache"):
+    """Answer ``If-None-Match`` with 304 before running the view; tag fresh responses.
+
+    ``etag_func`` must stay cheap (the catalog snapshot, single-row lookups)
+    since it runs on every request, including the ones answered with 304.
+    """
+
+    def decorator(func: Callable):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            etag = etag_func()
+            if request.if_none_match.contains_weak(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(func(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            # Weak: the tag names the content, which may be sent in any Content-Encoding.
+            response.set_etag(etag, weak=True)
+            response.headers["Cache-Control"] = cache_control
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,99 @@
+"""JSON encoding for responses: orjson when it is installed, the stdlib otherwise.
+
+Both providers keep Flask's output contract (sorted keys, compact bodies outside
+debug, Flask's handling of dates and other non-native types) and add
+``dumps_bytes`` for bodies that are pre-encoded or streamed.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Iterable
+
+from flask import Flask, Response, current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_ITEMS = 256
+
+
+class CompactJSONProvider(DefaultJSONProvider):
+    """Stdlib provider with a compact, UTF-8 ``dumps_bytes``."""
+
+    def dumps_bytes(self, obj) -> bytes:
+        return self.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+class OrjsonProvider(CompactJSONProvider):
+    """orjson-backed provider; falls back to the stdlib for unsupported keyword options."""
+
+    def _options(self, pretty: bool = False) -> int:
+        # Datetimes go through ``default`` so they keep Flask's HTTP-date format.
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs.keys() - {"separators"}:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def dumps_bytes(self, obj) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._options())
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._options(pretty))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def configure_json(app: Flask):
+    """Install the provider named by ``JSON_PROVIDER`` (``auto``, ``orjson`` or ``stdlib``)."""
+    choice = app.config.get("JSON_PROVIDER", "auto")
+    if choice not in ("auto", "orjson", "stdlib"):
+        raise ValueError(f"Unknown JSON_PROVIDER {choice!r}")
+    if choice == "orjson" and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson but the orjson package is not installed")
+
+    use_orjson = orjson is not None and choice != "stdlib"
+    app.json = OrjsonProvider(app) if use_orjson else CompactJSONProvider(app)
+    logger.info("Using %s for JSON responses", "orjson" if use_orjson else "stdlib json")
+
+
+def stream_json_array(items: Iterable, chunk_items: int = STREAM_CHUNK_ITEMS) -> Response:
+    """Stream ``items`` as a JSON array, encoding ``chunk_items`` elements per chunk.
+
+    ``items`` may be a lazy iterator (e.g. a SQL result); it is consumed inside the
+    request context while the body is sent.
+    """
+    dumps_bytes = current_app.json.dumps_bytes
+
+    def generate():
+        yield b"["
+        chunk = []
+        first = True
+        for item in items:
+            chunk.append(dumps_bytes(item))
+            if len(chunk) >= chunk_items:
+                yield (b"" if first else b",") + b",".join(chunk)
+                first = False
+                chunk = []
+        if chunk:
+            yield (b"" if first else b",") + b",".join(chunk)
+        yield b"]\n"
+
+    return Response(stream_with_context(generate()), status=200, mimetype="application/json")
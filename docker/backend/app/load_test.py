@@ -0,0 +1,421 @@
+"""Replay student sessions against the API and record latency baselines.
+
+``python manage.py load-test --concurrency 16 --duration 60 --output base.json``
+runs virtual students that log in, open the dashboard, the curriculum and
+their program, and toggle a few course statuses (restoring them afterwards).
+It reports p50/p95/p99 latency, throughput and SQL statements per request for
+each step, and ``--baseline`` diffs a run against an earlier JSON result.
+
+Without ``--url`` the requests go through an in-process app built from the
+environment's configuration (SQLite or PostgreSQL); with ``--url`` they go over
+HTTP to a running server, which must set ``EXPOSE_QUERY_COUNT=true`` for the
+query counts. Users default to the ones made by ``generate-dataset``.
+"""
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import logging
+import math
+import platform
+import random
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import click
+
+from extensions import QUERY_COUNT_HEADER, init_query_count_header
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMAIL_TEMPLATE = "user{n:06d}@synthetic.tec.ac.cr"
+STEPS = ("login", "dashboard", "curriculum", "program", "status-update")
+PERCENTILES = (50, 95, 99)
+# Latency keys compared against a baseline, and the query count.
+COMPARED_METRICS = ("p50Ms", "p95Ms", "p99Ms", "meanQueries")
+
+
+@dataclass
+class Reply:
+    status: int
+    body: bytes
+    queries: Optional[int]
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+
+class InProcessTransport:
+    """Calls the WSGI app directly; one test client per virtual user."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method: str, path: str, payload=None, token: Optional[str] = None) -> Reply:
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = self.client.open(path, method=method, json=payload, headers=headers)
+        queries = response.headers.get(QUERY_COUNT_HEADER)
+        return Reply(response.status_code, response.get_data(), int(queries) if queries else None)
+
+
+class HttpTransport:
+    """One keep-alive connection per virtual user; asks for gzip like a browser would."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self.prefix = parts.path.rstrip("/")
+        self.connection = connection_class(parts.hostname, parts.port, timeout=timeout)
+
+    def request(self, method: str, path: str, payload=None, token: Optional[str] = None) -> Reply:
+        headers = {"Accept": "application/json", "Accept-Encoding": "gzip"}
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            # Let the next request reconnect instead of reusing a broken socket.
+            self.connection.close()
+            raise
+        if response.getheader("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        queries = response.getheader(QUERY_COUNT_HEADER)
+        return Reply(response.status, data, int(queries) if queries else None)
+
+
+@dataclass
+class Sample:
+    elapsed_ms: float
+    ok: bool
+    queries: Optional[int]
+
+
+@dataclass
+class Recorder:
+    """Thread-safe samples per step; requests started before ``record_after`` are dropped."""
+
+    record_after: float
+    samples: Dict[str, List[Sample]] = field(default_factory=dict)
+    sessions: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, step: str, started: float, sample: Sample):
+        if started < self.record_after:
+            return
+        with self._lock:
+            self.samples.setdefault(step, []).append(sample)
+
+    def session_done(self, started: float):
+        if started >= self.record_after:
+            with self._lock:
+                self.sessions += 1
+
+
+@dataclass
+class LoadSpec:
+    concurrency: int = 8
+    duration: float = 30.0
+    warmup: float = 3.0
+    email_template: str = DEFAULT_EMAIL_TEMPLATE
+    user_count: int = 1000
+    password: str = "synthetic"
+    toggles: int = 2
+    think_ms: int = 0
+    seed: int = 1
+
+
+def _timed(recorder: Recorder, step: str, transport, method: str, path: str, **kwargs) -> Reply:
+    started = time.perf_counter()
+    try:
+        reply = transport.request(method, path, **kwargs)
+    except (http.client.HTTPException, OSError) as exc:
+        logger.warning("%s %s failed: %s", method, path, exc)
+        recorder.add(step, started, Sample((time.perf_counter() - started) * 1000, False, None))
+        return Reply(0, b"", None)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    recorder.add(step, started, Sample(elapsed_ms, 200 <= reply.status < 300, reply.queries))
+    return reply
+
+
+def _run_session(transport, rng: random.Random, spec: LoadSpec, recorder: Recorder):
+    """login -> dashboard -> curriculum -> program -> status toggles, restored afterwards."""
+    session_started = time.perf_counter()
+    email = spec.email_template.format(n=rng.randint(1, spec.user_count))
+    login = _timed(
+        recorder,
+        "login",
+        transport,
+        "POST",
+        "/auth/login",
+        payload={"email": email, "password": spec.password},
+    )
+    if login.status != 200:
+        return
+    session = login.json()
+    token = session["token"]
+    think = spec.think_ms / 1000
+
+    _timed(recorder, "dashboard", transport, "GET", "/users/me/dashboard", token=token)
+    time.sleep(think)
+    curriculum = _timed(recorder, "curriculum", transport, "GET", "/users/me/curriculum", token=token)
+    time.sleep(think)
+    program_code = (session["user"].get("program") or {}).get("code")
+    if program_code:
+        _timed(recorder, "program", transport, "GET", f"/programs/{program_code}")
+        time.sleep(think)
+
+    courses = []
+    if curriculum.status == 200:
+        courses = [
+            (course["code"], course["status"])
+            for block in curriculum.json()["blocks"]
+            for course in block["courses"]
+        ]
+    for code, status in rng.sample(courses, min(spec.toggles, len(courses))):
+        toggled = "in-progress" if status != "in-progress" else "approved"
+        for new_status in (toggled, status):
+            _timed(
+                recorder,
+                "status-update",
+                transport,
+                "PUT",
+                f"/users/me/course-status/{code}",
+                payload={"status": new_status},
+                token=token,
+            )
+        time.sleep(think)
+    recorder.session_done(session_started)
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(math.ceil(percentile / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict:
+    steps = {}
+    total_requests = 0
+    for step in STEPS:
+        samples = recorder.samples.get(step, [])
+        if not samples:
+            continue
+        latencies = sorted(sample.elapsed_ms for sample in samples)
+        queries = [sample.queries for sample in samples if sample.queries is not None]
+        total_requests += len(samples)
+        steps[step] = {
+            "requests": len(samples),
+            "errors": sum(1 for sample in samples if not sample.ok),
+            "rps": round(len(samples) / elapsed, 2),
+            **{
+                f"p{percentile}Ms": round(_percentile(latencies, percentile), 2)
+                for percentile in PERCENTILES
+            },
+            "maxMs": round(latencies[-1], 2),
+            "meanQueries": round(sum(queries) / len(queries), 2) if queries else None,
+        }
+    return {
+        "elapsedSeconds": round(elapsed, 2),
+        "requests": total_requests,
+        "rps": round(total_requests / elapsed, 2) if elapsed else 0.0,
+        "sessions": recorder.sessions,
+        "steps": steps,
+    }
+
+
+def run_load_test(transport_factory, spec: LoadSpec) -> Dict:
+    """Run ``spec.concurrency`` virtual users for warm-up plus ``spec.duration`` seconds."""
+    started = time.perf_counter()
+    recorder = Recorder(record_after=started + spec.warmup)
+    deadline = recorder.record_after + spec.duration
+
+    def worker(number: int):
+        rng = random.Random(f"{spec.seed}:{number}")
+        transport = transport_factory()
+        while time.perf_counter() < deadline:
+            _run_session(transport, rng, spec, recorder)
+
+    threads = [
+        threading.Thread(target=worker, args=(number,), name=f"load-{number}", daemon=True)
+        for number in range(spec.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(recorder, time.perf_counter() - recorder.record_after)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> Tuple[List[str], int]:
+    """Describe per-step changes against ``baseline``; counts increases beyond ``tolerance``."""
+    lines = []
+    regressions = 0
+    for step, current in result["steps"].items():
+        previous = baseline.get("steps", {}).get(step)
+        if previous is None:
+            lines.append(f"{step:<14} (not in baseline)")
+            continue
+        changes = []
+        for metric in COMPARED_METRICS:
+            before, after = previous.get(metric), current.get(metric)
+            if before is None or after is None:
+                continue
+            delta = (after - before) / before if before else 0.0
+            flag = ""
+            if delta > tolerance:
+                regressions += 1
+                flag = " !"
+            changes.append(f"{metric} {before:g} -> {after:g} ({delta:+.0%}){flag}")
+        lines.append(f"{step:<14} " + ", ".join(changes))
+    return lines, regressions
+
+
+def _print_report(result: Dict):
+    click.echo(
+        f"{result['requests']} requests in {result['elapsedSeconds']}s "
+        f"({result['rps']} req/s, {result['sessions']} sessions)"
+    )
+    click.echo(
+        f"{'step':<14}{'requests':>9}{'errors':>8}{'rps':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}"
+    )
+    for step, data in result["steps"].items():
+        queries = "-" if data["meanQueries"] is None else f"{data['meanQueries']:g}"
+        click.echo(
+            f"{step:<14}{data['requests']:>9}{data['errors']:>8}{data['rps']:>9}"
+            f"{data['p50Ms']:>9}{data['p95Ms']:>9}{data['p99Ms']:>9}{queries:>9}"
+        )
+
+
+@click.command("load-test")
+@click.option("--url", default=None, help="Base URL of a running server (default: in-process).")
+@click.option("--concurrency", default=LoadSpec.concurrency, show_default=True)
+@click.option("--duration", default=LoadSpec.duration, show_default=True, help="Seconds measured.")
+@click.option("--warmup", default=LoadSpec.warmup, show_default=True, help="Seconds discarded.")
+@click.option("--email-template", default=DEFAULT_EMAIL_TEMPLATE, show_default=True)
+@click.option("--user-count", default=LoadSpec.user_count, show_default=True)
+@click.option("--password", default=LoadSpec.password, show_default=True)
+@click.option("--toggles", default=LoadSpec.toggles, show_default=True)
+@click.option("--think-ms", default=LoadSpec.think_ms, show_default=True)
+@click.option("--seed", default=LoadSpec.seed, show_default=True)
+@click.option("--output", type=click.Path(dir_okay=False, path_type=Path), default=None)
+@click.option("--baseline", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--tolerance",
+    default=0.10,
+    show_default=True,
+    help="Relative increase over the baseline that counts as a regression.",
+)
+@click.option("--fail-on-regression", is_flag=True)
+def load_test_command(
+    url: Optional[str],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    email_template: str,
+    user_count: int,
+    password: str,
+    toggles: int,
+    think_ms: int,
+    seed: int,
+    output: Optional[Path],
+    baseline: Optional[Path],
+    tolerance: float,
+    fail_on_regression: bool,
+):
+    """Replay student sessions and report latency, throughput and SQL per request."""
+    spec = LoadSpec(
+        concurrency=concurrency,
+        duration=duration,
+        warmup=warmup,
+        email_template=email_template,
+        user_count=user_count,
+        password=password,
+        toggles=toggles,
+        think_ms=think_ms,
+        seed=seed,
+    )
+
+    if url:
+        target = url
+        database = None
+        result = run_load_test(lambda: HttpTransport(url), spec)
+    else:
+        # A separately built app, so the run includes startup checks and cache warm-up.
+        from app import create_app
+        from extensions import db
+
+        app = create_app()
+        if not app.config.get("EXPOSE_QUERY_COUNT"):
+            init_query_count_header(app)
+        with app.app_context():
+            database = db.engine.dialect.name
+        target = "in-process"
+        result = run_load_test(lambda: InProcessTransport(app), spec)
+
+    result = {
+        "meta": {
+            "commit": _git_commit(),
+            "createdAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "target": target,
+            "database": database,
+            "python": platform.python_version(),
+            "spec": {
+                "concurrency": concurrency,
+                "duration": duration,
+                "warmup": warmup,
+                "userCount": user_count,
+                "toggles": toggles,
+                "thinkMs": think_ms,
+                "seed": seed,
+            },
+        },
+        **result,
+    }
+    _print_report(result)
+
+    if output:
+        output.write_text(json.dumps(result, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        click.echo(f"Wrote {output}")
+
+    if baseline:
+        previous = json.loads(baseline.read_text(encoding="utf-8"))
+        lines, regressions = compare(result, previous, tolerance)
+        previous_meta = previous.get("meta", {})
+        click.echo(f"Compared with {baseline} (commit {previous_meta.get('commit')}):")
+        for key in ("target", "database", "spec"):
+            if previous_meta.get(key) != result["meta"][key]:
+                click.echo(f"  note: baseline {key} differs ({previous_meta.get(key)!r})")
+        for line in lines:
+            click.echo(f"  {line}")
+        if regressions and fail_on_regression:
+            raise click.ClickException(f"{regressions} metric(s) regressed beyond {tolerance:.0%}")
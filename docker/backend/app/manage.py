@@ -0,0 +1,16 @@
+"""Command-line entry point: ``python manage.py <command>``.
+
+``flask --app`` cannot be used here because the application directory is also
+a package, which makes Flask import it as ``app.app``. Commands get an app
+without the startup schema check, so ``migrate`` and ``seed`` can run against
+an empty database.
+"""
+from flask.cli import FlaskGroup
+
+from app import create_app
+
+cli = FlaskGroup(create_app=lambda: create_app(initialize=False))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,173 @@
+"""Schema versioning for deployments that outlive a single ``create_all``.
+
+``python manage.py migrate`` (or ``seed``) brings the database up to
+``SCHEMA_VERSION`` once, under a cross-process lock; application processes only
+read the ``schema_version`` marker at startup.
+"""
+from __future__ import annotations
+
+import fcntl
+import logging
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+
+import click
+from sqlalchemy import inspect, select, text
+from sqlalchemy.exc import DBAPIError
+
+from cache_generation import ensure_generation_row
+from db_pool import is_memory_database
+from extensions import db
+from models import RefreshSession, SchemaVersion
+from progress import rebuild_progress
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary, stable key shared by every process that migrates or seeds.
+_ADVISORY_LOCK_KEY = 72_031_204
+
+
+def _inspector():
+    return inspect(db.session.connection())
+
+
+def _add_user_revision():
+    columns = {column["name"] for column in _inspector().get_columns("users")}
+    if "revision" not in columns:
+        db.session.execute(
+            text("ALTER TABLE users ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+        )
+
+
+def _add_course_section_unique_index():
+    inspector = _inspector()
+    names = {index["name"] for index in inspector.get_indexes("course_sections")}
+    names.update(
+        constraint["name"] for constraint in inspector.get_unique_constraints("course_sections")
+    )
+    if "uq_course_section" not in names:
+        db.session.execute(
+            text(
+                "CREATE UNIQUE INDEX uq_course_section "
+                "ON course_sections (course_id, term, section_code)"
+            )
+        )
+
+
+def _create_missing_indexes():
+    connection = db.session.connection()
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+
+def _create_refresh_sessions():
+    RefreshSession.__table__.create(bind=db.session.connection(), checkfirst=True)
+
+
+def _backfill_progress():
+    rebuilt = rebuild_progress()
+    logger.info("Backfilled progress summaries for %d user(s)", rebuilt)
+
+
+# Version 1 is the baseline schema produced by ``db.create_all()``. Steps must be
+# idempotent: on a fresh database ``create_all`` has already done their work.
+MIGRATIONS: List[Tuple[int, str, Callable[[], None]]] = [
+    (2, "add users.revision", _add_user_revision),
+    (3, "unique course_sections (course_id, term, section_code)", _add_course_section_unique_index),
+    (4, "backfill user_progress", _backfill_progress),
+    (5, "secondary indexes on foreign keys and filter columns", _create_missing_indexes),
+    (6, "cache_generation counter row", ensure_generation_row),
+    (7, "refresh_sessions (single-use refresh tokens)", _create_refresh_sessions),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+@contextmanager
+def setup_lock():
+    """Serialize migrate/seed runs across processes and replicas.
+
+    Uses a transaction-scoped advisory lock on PostgreSQL, held on its own
+    connection (so it also works through a transaction-mode PgBouncer), and an
+    ``flock`` next to file-backed SQLite databases; in-memory SQLite is private
+    to the process.
+    """
+    engine = db.engine
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection, connection.begin():
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY}
+            )
+            yield
+    elif engine.dialect.name == "sqlite" and not is_memory_database(engine.url):
+        with open(f"{engine.url.database}.setup-lock", "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+    else:
+        yield
+
+
+def current_schema_version() -> int:
+    """Return the recorded schema version, or 0 when the database was never migrated."""
+    try:
+        version = db.session.execute(
+            select(SchemaVersion.version).where(SchemaVersion.id == 1)
+        ).scalar()
+    except DBAPIError:
+        db.session.rollback()
+        return 0
+    return version or 0
+
+
+def _stamp(version: int):
+    marker = db.session.get(SchemaVersion, 1)
+    if marker is None:
+        db.session.add(SchemaVersion(id=1, version=version))
+    else:
+        marker.version = version
+
+
+def migrate() -> int:
+    """Create missing tables and apply pending migrations. Call under ``setup_lock``."""
+    db.create_all()
+    current = current_schema_version()
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        logger.info("Applying schema migration %d: %s", version, description)
+        try:
+            step()
+            _stamp(version)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    if current >= SCHEMA_VERSION:
+        logger.info("Database schema already at version %d", current)
+    return SCHEMA_VERSION
+
+
+def ensure_schema_current():
+    """Fail fast when the database has not been migrated to this code's schema."""
+    version = current_schema_version()
+    if version < SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {SCHEMA_VERSION}; "
+            "run `python manage.py seed` (or `migrate`) before starting the server"
+        )
+    if version > SCHEMA_VERSION:
+        logger.warning(
+            "Database schema version %d is newer than this build (%d)", version, SCHEMA_VERSION
+        )
+
+
+@click.command("migrate")
+def migrate_command():
+    """Create tables and apply pending schema migrations."""
+    with setup_lock():
+        version = migrate()
+    click.echo(f"Database schema at version {version}")
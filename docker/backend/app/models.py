@@ -53,7 +53,7 @@ class CourseBlock(db.Model):
     __tablename__ = "course_blocks"
 
     id = db.Column(db.Integer, primary_key=True)
-    program_id = db.Column(db.Integer, db.ForeignKey("programs.id"), nullable=False)
+    program_id = db.Column(db.Integer, db.ForeignKey("programs.id"), nullable=False, index=True)
     block_number = db.Column(db.Integer, nullable=False)
 
     courses = db.relationship("Course", backref="block", lazy=True)
@@ -72,8 +72,8 @@ class Course(db.Model):
     __tablename__ = "courses"
 
     id = db.Column(db.Integer, primary_key=True)
-    program_id = db.Column(db.Integer, db.ForeignKey("programs.id"), nullable=False)
-    block_id = db.Column(db.Integer, db.ForeignKey("course_blocks.id"), nullable=False)
+    program_id = db.Column(db.Integer, db.ForeignKey("programs.id"), nullable=False, index=True)
+    block_id = db.Column(db.Integer, db.ForeignKey("course_blocks.id"), nullable=False, index=True)
     code = db.Column(db.String(16), unique=True, nullable=False)
     name = db.Column(db.String(255), nullable=False)
     credits = db.Column(db.Integer, default=0)
@@ -107,6 +107,8 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     carne = db.Column(db.String(32), unique=True, nullable=False)
     program_id = db.Column(db.Integer, db.ForeignKey("programs.id"), nullable=False)
+    # Bumped on every write that changes what the /users/me views return.
+    revision = db.Column(db.Integer, default=0, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
@@ -116,6 +118,17 @@ class User(db.Model):
     course_statuses = db.relationship("UserCourseStatus", backref="user", lazy=True)
     schedule_entries = db.relationship("UserScheduleEntry", backref="user", lazy=True)
 
+    @classmethod
+    def bump_revision(cls, user_id: int):
+        """Invalidate cached /users/me views; incremented in SQL to stay race-free."""
+        cls.query.filter_by(id=user_id).update(
+            {cls.revision: cls.revision + 1}, synchronize_session=False
+        )
+
+    @classmethod
+    def current_revision(cls, user_id: int) -> int:
+        return db.session.query(cls.revision).filter(cls.id == user_id).scalar() or 0
+
     def to_dict(self) -> Dict:
         return {
             "id": self.id,
@@ -129,13 +142,29 @@ class User(db.Model):
         }
 
 
+class RefreshSession(db.Model):
+    """One sign-in's refresh token chain.
+
+    ``counter`` is advanced by every refresh, so each refresh token works once;
+    deleting the row (logout, detected reuse) revokes the chain.
+    """
+
+    __tablename__ = "refresh_sessions"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    counter = db.Column(db.Integer, default=0, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
 class UserCourseStatus(db.Model):
     __tablename__ = "user_course_statuses"
     __table_args__ = (UniqueConstraint("user_id", "course_id", name="uq_user_course"),)
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    course_id = db.Column(db.Integer, db.ForeignKey("courses.id"), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey("courses.id"), nullable=False, index=True)
     status = db.Column(db.String(16), nullable=False, default="not-coursed")
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
@@ -149,8 +178,27 @@ class UserCourseStatus(db.Model):
         return base
 
 
+class UserProgress(db.Model):
+    """Materialized progress summary, kept in step with ``user_course_statuses``."""
+
+    __tablename__ = "user_progress"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    completed_credits = db.Column(db.Integer, nullable=False, default=0)
+    approved_courses = db.Column(db.Integer, nullable=False, default=0)
+    current_block = db.Column(db.Integer, nullable=False, default=0)
+    # {block_number: courses approved or in progress in that block}
+    block_counts = db.Column(db.JSON, nullable=False, default=dict)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+
 class CourseSection(db.Model):
     __tablename__ = "course_sections"
+    __table_args__ = (
+        UniqueConstraint("course_id", "term", "section_code", name="uq_course_section"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     course_id = db.Column(db.Integer, db.ForeignKey("courses.id"), nullable=False)
@@ -181,7 +229,9 @@ class CourseMeeting(db.Model):
     __tablename__ = "course_meetings"
 
     id = db.Column(db.Integer, primary_key=True)
-    section_id = db.Column(db.Integer, db.ForeignKey("course_sections.id"), nullable=False)
+    section_id = db.Column(
+        db.Integer, db.ForeignKey("course_sections.id"), nullable=False, index=True
+    )
     day_of_week = db.Column(db.String(16), nullable=False)
     start_time = db.Column(db.Time, nullable=False)
     end_time = db.Column(db.Time, nullable=False)
@@ -196,6 +246,7 @@ class CourseMeeting(db.Model):
 
 class UserScheduleEntry(db.Model):
     __tablename__ = "user_schedule_entries"
+    __table_args__ = (db.Index("ix_user_schedule_entries_user_term", "user_id", "term"),)
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -213,6 +264,7 @@ class UserScheduleEntry(db.Model):
 
 class AcademicEvent(db.Model):
     __tablename__ = "academic_events"
+    __table_args__ = (db.Index("ix_academic_events_program_date", "program_id", "event_date"),)
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
@@ -232,3 +284,26 @@ class AcademicEvent(db.Model):
             "severity": self.severity,
             "programCode": self.program.code if self.program else None,
         }
+
+
+class SchemaVersion(db.Model):
+    """Single-row marker recording the last migration applied to the database."""
+
+    __tablename__ = "schema_version"
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class CacheGeneration(db.Model):
+    """Single-row counter bumped by every write to cached catalog, section or event data.
+
+    Each process compares it with the value it last saw to notice writes made by
+    other workers and CLI commands.
+    """
+
+    __tablename__ = "cache_generation"
+
+    id = db.Column(db.Integer, primary_key=True)
+    generation = db.Column(db.Integer, default=0, nullable=False)
@@ -0,0 +1,106 @@
+"""Password hashing off the request threads.
+
+The KDF (scrypt or PBKDF2, via Werkzeug) runs in a small per-worker process
+pool so a burst of logins cannot starve the threads serving everything else.
+A semaphore caps how many hashes one worker runs or queues at a time; callers
+past the cap wait up to ``PASSWORD_HASH_WAIT_SECONDS`` and then get
+``HashingBusy`` instead of piling up behind the pool.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+logger = logging.getLogger(__name__)
+
+
+class HashingBusy(Exception):
+    """Raised when every hashing slot stays taken for the configured wait."""
+
+
+def hash_method(password_hash: str) -> str:
+    """The method part of a Werkzeug hash, e.g. ``scrypt:32768:8:1``."""
+    return password_hash.split("$", 1)[0]
+
+
+class PasswordHasher:
+    def __init__(self, method: str, workers: int, max_pending: int, wait_seconds: float):
+        self.method = method
+        self.workers = workers
+        self.wait_seconds = wait_seconds
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._executor_lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Pools do not survive a fork; a preloaded master's pool is rebuilt in each worker.
+        pid = os.getpid()
+        with self._executor_lock:
+            if self._executor is None or self._executor_pid != pid:
+                # "spawn" keeps the children from inheriting this process's threads and sockets.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._executor_pid = pid
+            return self._executor
+
+    def _discard_pool(self, executor: ProcessPoolExecutor):
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, func: Callable, *args):
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            raise HashingBusy()
+        try:
+            if self.workers <= 0:
+                return func(*args)
+            executor = self._pool()
+            try:
+                return executor.submit(func, *args).result()
+            except BrokenProcessPool:
+                logger.warning("Password hashing pool died; restarting it")
+                self._discard_pool(executor)
+                return self._pool().submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True when the hash was made with other parameters than ``method``."""
+        return hash_method(password_hash) != self.method
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                config = current_app.config
+                _hasher = PasswordHasher(
+                    method=config["PASSWORD_HASH_METHOD"],
+                    workers=config["PASSWORD_HASH_WORKERS"],
+                    max_pending=config["PASSWORD_HASH_MAX_PENDING"],
+                    wait_seconds=config["PASSWORD_HASH_WAIT_SECONDS"],
+                )
+    return _hasher
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from extensions import db
+from models import Course, CourseBlock
+
+logger = logging.getLogger(__name__)
+
+NO_REQUIREMENTS = {"", "no hay", "ninguno", "n/a"}
+
+_graphs: Dict[int, "PrerequisiteGraph"] = {}
+_graphs_lock = threading.Lock()
+
+
+def parse_course_codes(value: Optional[str]) -> List[str]:
+    """Split a free-text requisites list such as "IC1802, IC1803" into course codes."""
+    if not value or value.strip().lower() in NO_REQUIREMENTS:
+        return []
+    return [code.strip() for code in value.split(",") if code.strip()]
+
+
+def iter_bits(mask: int):
+    """Yield the indices of the set bits in ``mask`` from lowest to highest."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+@dataclass(frozen=True)
+class PrerequisiteGraph:
+    """Compiled prerequisite DAG for one program.
+
+    Courses are numbered in topological order (prerequisites first) and every
+    relation is stored as an integer bitset over those indices, so eligibility
+    checks are a handful of big-int word operations instead of string parsing.
+    """
+
+    program_id: int
+    codes: Tuple[str, ...]
+    course_ids: Tuple[int, ...]
+    index_by_code: Mapping[str, int]
+    index_by_id: Mapping[int, int]
+    prerequisites: Tuple[int, ...]
+    corequisites: Tuple[int, ...]
+    dependents: Tuple[int, ...]
+    # Courses that are a prerequisite of at least one other course.
+    gating: int
+    # Courses whose requisites reference codes outside the program; never eligible.
+    unresolved: int
+
+    @property
+    def size(self) -> int:
+        return len(self.codes)
+
+    @property
+    def all_mask(self) -> int:
+        return (1 << len(self.codes)) - 1
+
+    def status_mask(self, statuses: Mapping[int, str], accepted: Iterable[str]) -> int:
+        """Build the bitset of courses whose status (keyed by course id) is in ``accepted``."""
+        accepted = set(accepted)
+        mask = 0
+        for course_id, status in statuses.items():
+            index = self.index_by_id.get(course_id)
+            if index is not None and status in accepted:
+                mask |= 1 << index
+        return mask
+
+    def eligible_mask(self, satisfied: int) -> int:
+        """Return the courses not in ``satisfied`` whose prerequisites all are.
+
+        Work is proportional to the unsatisfied courses that gate others, each
+        costing one OR over a ``size / 64`` word bitset.
+        """
+        blocked = self.unresolved
+        for index in iter_bits(self.gating & ~satisfied):
+            blocked |= self.dependents[index]
+        return self.all_mask & ~satisfied & ~blocked
+
+    def newly_eligible(self, satisfied: int, index: int) -> int:
+        """Return the courses unlocked by adding ``index`` to ``satisfied``."""
+        updated = satisfied | (1 << index)
+        candidates = self.dependents[index] & ~updated & ~self.unresolved
+        unlocked = 0
+        for dependent in iter_bits(candidates):
+            if not self.prerequisites[dependent] & ~updated:
+                unlocked |= 1 << dependent
+        return unlocked
+
+    def codes_for(self, mask: int) -> List[str]:
+        return [self.codes[index] for index in iter_bits(mask)]
+
+    def ids_for(self, mask: int) -> List[int]:
+        return [self.course_ids[index] for index in iter_bits(mask)]
+
+
+def _topological_order(
+    codes: Sequence[str],
+    edges: Mapping[str, Sequence[str]],
+    rank: Mapping[str, Tuple],
+) -> List[str]:
+    """Kahn's algorithm; ties are broken by ``rank`` so the order is stable."""
+    indegree = {code: 0 for code in codes}
+    children: Dict[str, List[str]] = {code: [] for code in codes}
+    for code in codes:
+        for requirement in edges.get(code, ()):
+            if requirement in indegree and requirement != code:
+                indegree[code] += 1
+                children[requirement].append(code)
+
+    ready = [(rank[code], code) for code, degree in indegree.items() if degree == 0]
+    heapq.heapify(ready)
+    ordered = []
+    while ready:
+        _, code = heapq.heappop(ready)
+        ordered.append(code)
+        for child in children[code]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                heapq.heappush(ready, (rank[child], child))
+
+    if len(ordered) < len(codes):
+        placed = set(ordered)
+        remaining = sorted((code for code in codes if code not in placed), key=rank.get)
+        logger.warning("Prerequisite cycle detected among courses: %s", ", ".join(remaining))
+        ordered.extend(remaining)
+    return ordered
+
+
+def compile_program(program_id: int) -> PrerequisiteGraph:
+    """Parse the program's requisites once and cache the compiled graph."""
+    rows = (
+        db.session.query(
+            Course.id,
+            Course.code,
+            Course.requisitos,
+            Course.correquisitos,
+            CourseBlock.block_number,
+        )
+        .join(CourseBlock, Course.block_id == CourseBlock.id)
+        .filter(Course.program_id == program_id)
+        .all()
+    )
+
+    ids = {code: course_id for course_id, code, _, _, _ in rows}
+    requirements = {code: parse_course_codes(req) for _, code, req, _, _ in rows}
+    corequirements = {code: parse_course_codes(coreq) for _, code, _, coreq, _ in rows}
+    rank = {code: (block_number, code) for _, code, _, _, block_number in rows}
+
+    ordered = _topological_order(list(ids), requirements, rank)
+    index_by_code = {code: index for index, code in enumerate(ordered)}
+
+    prerequisites = [0] * len(ordered)
+    corequisites = [0] * len(ordered)
+    dependents = [0] * len(ordered)
+    unresolved = 0
+    for index, code in enumerate(ordered):
+        for requirement in requirements[code]:
+            requirement_index = index_by_code.get(requirement)
+            if requirement_index is None:
+                unresolved |= 1 << index
+                continue
+            prerequisites[index] |= 1 << requirement_index
+            dependents[requirement_index] |= 1 << index
+        for corequirement in corequirements[code]:
+            corequirement_index = index_by_code.get(corequirement)
+            if corequirement_index is not None:
+                corequisites[index] |= 1 << corequirement_index
+
+    graph = PrerequisiteGraph(
+        program_id=program_id,
+        codes=tuple(ordered),
+        course_ids=tuple(ids[code] for code in ordered),
+        index_by_code=index_by_code,
+        index_by_id={ids[code]: index for code, index in index_by_code.items()},
+        prerequisites=tuple(prerequisites),
+        corequisites=tuple(corequisites),
+        dependents=tuple(dependents),
+        gating=sum(1 << index for index, mask in enumerate(dependents) if mask),
+        unresolved=unresolved,
+    )
+    with _graphs_lock:
+        _graphs[program_id] = graph
+    logger.info("Compiled prerequisite graph for program %s (%d courses)", program_id, graph.size)
+    return graph
+
+
+def get_graph(program_id: int) -> PrerequisiteGraph:
+    """Return the cached graph for ``program_id``, compiling it on first use."""
+    graph = _graphs.get(program_id)
+    if graph is None:
+        graph = compile_program(program_id)
+    return graph
+
+
+def invalidate(program_id: Optional[int] = None):
+    """Drop the compiled graph for one program, or all of them."""
+    with _graphs_lock:
+        if program_id is None:
+            _graphs.clear()
+        else:
+            _graphs.pop(program_id, None)
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import click
+from sqlalchemy import delete, func, insert, select
+
+from catalog import get_program
+from extensions import db, upsert_insert
+from models import Course, CourseBlock, User, UserCourseStatus, UserProgress
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = {"approved", "in-progress"}
+
+_REBUILD_BATCH_SIZE = 5000
+
+# (credits, block_number, old_status, new_status)
+StatusChange = Tuple[Optional[int], Optional[int], Optional[str], str]
+
+
+def _current_block(block_counts: Dict[str, int]) -> int:
+    return max((int(block) for block, count in block_counts.items() if count > 0), default=0)
+
+
+def apply_status_change(
+    user_id: int,
+    credits: Optional[int],
+    block_number: Optional[int],
+    old_status: Optional[str],
+    new_status: str,
+):
+    """Fold one course's old -> new status transition into the user's summary."""
+    apply_status_changes(user_id, [(credits, block_number, old_status, new_status)])
+
+
+def lock_progress(user_id: int) -> Optional[UserProgress]:
+    """Lock the user's summary row (``SELECT ... FOR UPDATE`` where supported).
+
+    Status writers call this before reading the old statuses they pass to
+    ``apply_status_changes``; otherwise two concurrent updates of one course
+    read the same old status and both apply its delta.
+    """
+    return UserProgress.query.filter_by(user_id=user_id).with_for_update().one_or_none()
+
+
+def apply_status_changes(user_id: int, changes: Iterable[StatusChange]):
+    """Fold (credits, block_number, old_status, new_status) transitions into the summary.
+
+    Runs inside the caller's transaction, which must already hold ``lock_progress``
+    from before the old statuses were read.
+    """
+    changes = [change for change in changes if change[2] != change[3]]
+    if not changes:
+        return
+
+    summary = lock_progress(user_id)
+    if summary is None:
+        # No summary yet (e.g. rows that predate the table): the rebuild already
+        # sees the caller's pending changes once they are flushed.
+        db.session.flush()
+        rebuild_progress([user_id])
+        return
+
+    block_counts = dict(summary.block_counts or {})
+    for credits, block_number, old_status, new_status in changes:
+        credits = credits or 0
+        if old_status == "approved":
+            summary.completed_credits -= credits
+            summary.approved_courses -= 1
+        if new_status == "approved":
+            summary.completed_credits += credits
+            summary.approved_courses += 1
+
+        if block_number is None:
+            continue
+        key = str(block_number)
+        delta_block = (new_status in ACTIVE_STATUSES) - (old_status in ACTIVE_STATUSES)
+        if delta_block:
+            block_counts[key] = block_counts.get(key, 0) + delta_block
+            if block_counts[key] <= 0:
+                del block_counts[key]
+
+    summary.block_counts = block_counts
+    summary.current_block = _current_block(block_counts)
+
+
+def rebuild_progress(user_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute summaries from ``user_course_statuses`` with grouped aggregate queries.
+
+    Rebuilds every user when ``user_ids`` is None. The caller owns the transaction.
+    """
+    if user_ids is None:
+        target_ids = [user_id for (user_id,) in db.session.execute(select(User.id))]
+    else:
+        target_ids = list(user_ids)
+
+    rebuilt = 0
+    for start in range(0, len(target_ids), _REBUILD_BATCH_SIZE):
+        batch = target_ids[start : start + _REBUILD_BATCH_SIZE]
+        aggregates = db.session.execute(
+            select(
+                UserCourseStatus.user_id,
+                CourseBlock.block_number,
+                UserCourseStatus.status,
+                func.count(),
+                func.coalesce(func.sum(Course.credits), 0),
+            )
+            .join(Course, UserCourseStatus.course_id == Course.id)
+            .join(CourseBlock, Course.block_id == CourseBlock.id)
+            .where(
+                UserCourseStatus.user_id.in_(batch),
+                UserCourseStatus.status.in_(ACTIVE_STATUSES),
+            )
+            .group_by(UserCourseStatus.user_id, CourseBlock.block_number, UserCourseStatus.status)
+        )
+
+        now = datetime.utcnow()
+        rows: Dict[int, Dict] = {
+            user_id: {
+                "user_id": user_id,
+                "completed_credits": 0,
+                "approved_courses": 0,
+                "current_block": 0,
+                "block_counts": {},
+                "updated_at": now,
+            }
+            for user_id in batch
+        }
+        for user_id, block_number, status, count, credits in aggregates:
+            row = rows[user_id]
+            key = str(block_number)
+            row["block_counts"][key] = row["block_counts"].get(key, 0) + count
+            if status == "approved":
+                row["completed_credits"] += credits
+                row["approved_courses"] += count
+        for row in rows.values():
+            row["current_block"] = _current_block(row["block_counts"])
+
+        _write_summaries(batch, list(rows.values()))
+        rebuilt += len(batch)
+
+    return rebuilt
+
+
+def _write_summaries(user_ids: List[int], rows: List[Dict]):
+    # An upsert, so concurrent rebuilds of a missing summary (e.g. two first
+    # page loads) both succeed instead of one hitting the primary key.
+    statement = upsert_insert(UserProgress.__table__)
+    if statement is not None:
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                column: getattr(statement.excluded, column)
+                for column in (
+                    "completed_credits",
+                    "approved_courses",
+                    "current_block",
+                    "block_counts",
+                    "updated_at",
+                )
+            },
+        )
+        db.session.execute(statement, rows)
+        return
+
+    db.session.execute(delete(UserProgress).where(UserProgress.user_id.in_(user_ids)))
+    db.session.execute(insert(UserProgress.__table__), rows)
+
+
+def get_progress_summary(user_id: int) -> UserProgress:
+    """The user's summary, rebuilt in the request's transaction when it is missing.
+
+    Read-only requests never commit, so such a rebuild is simply repeated until
+    a write commits one.
+    """
+    summary = db.session.get(UserProgress, user_id)
+    if summary is None:
+        rebuild_progress([user_id])
+        summary = db.session.get(UserProgress, user_id)
+    return summary
+
+
+def calculate_progress(user) -> Dict:
+    """Build the progress payload from the summary row and the cached catalog."""
+    summary = get_progress_summary(user.id)
+    program = get_program(user.program_id)
+    total_credits = program.total_credits if program else 0
+    number_of_semesters = program.number_of_semesters if program else 0
+    completed_credits = summary.completed_credits
+
+    progress_percentage = (
+        round((completed_credits / total_credits) * 100)
+        if total_credits
+        else 0
+    )
+
+    current_semester = max(summary.current_block, 1)
+    remaining_semesters = max(
+        (number_of_semesters or current_semester) - current_semester, 0
+    )
+
+    return {
+        "progress": progress_percentage,
+        "completedCredits": completed_credits,
+        "totalCredits": total_credits,
+        "currentSemester": current_semester,
+        "remainingSemesters": remaining_semesters,
+    }
+
+
+@click.command("reconcile-progress")
+@click.option("--user-id", "user_ids", type=int, multiple=True, help="Limit to these users.")
+def reconcile_progress_command(user_ids: List[int]):
+    """Rebuild user_progress summaries from the course statuses."""
+    try:
+        rebuilt = rebuild_progress(user_ids or None)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    logger.info("Rebuilt progress summaries for %d user(s)", rebuilt)
+    click.echo(f"Rebuilt progress for {rebuilt} user(s)")
@@ -1,14 +1,45 @@
+import logging
+
 from flask import Blueprint, jsonify, request
-from werkzeug.security import check_password_hash, generate_password_hash
 
-from auth_utils import generate_token
+from auth_utils import (
+    generate_token,
+    revoke_refresh_token,
+    rotate_refresh_token,
+    start_refresh_session,
+)
 from extensions import db
-from models import CourseSection, Program, User, UserCourseStatus, UserScheduleEntry
+from models import Program, User
+from passwords import HashingBusy, get_password_hasher
 from seed_data import CURRENT_TERM
+from user_init import initialize_user_courses
+
+logger = logging.getLogger(__name__)
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
 
+def _session_response(user: User, refresh_token: str, status: int):
+    return (
+        jsonify(
+            {
+                "token": generate_token(user),
+                "refreshToken": refresh_token,
+                "user": user.to_dict(),
+            }
+        ),
+        status,
+    )
+
+
+@auth_bp.errorhandler(HashingBusy)
+def hashing_busy(error):
+    logger.warning("Password hashing saturated; rejecting %s", request.path)
+    response = jsonify({"message": "Too many sign-in attempts, please retry shortly"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+
 @auth_bp.route("/signup", methods=["POST"])
 def signup():
     payload = request.get_json() or {}
@@ -37,7 +68,7 @@ def signup():
     user = User(
         name=payload["name"].strip(),
         email=email,
-        password_hash=generate_password_hash(payload["password"]),
+        password_hash=get_password_hasher().hash(payload["password"]),
         carne=carne,
         program=program,
     )
@@ -45,50 +76,12 @@ def signup():
     db.session.add(user)
     db.session.flush()  # Ensure user.id is available
 
-    # Initialize course statuses for the selected program
-    statuses = []
-    in_progress_course_ids = []
-    for course in program.courses:
-        initial_status = course.default_status or "not-coursed"
-        if initial_status == "in-progress":
-            in_progress_course_ids.append(course.id)
-        statuses.append(
-            UserCourseStatus(
-                user_id=user.id,
-                course_id=course.id,
-                status=initial_status,
-            )
-        )
-    db.session.bulk_save_objects(statuses)
-
-    if in_progress_course_ids:
-        sections = CourseSection.query.filter(
-            CourseSection.course_id.in_(in_progress_course_ids),
-            CourseSection.term == CURRENT_TERM,
-        ).all()
-        for section in sections:
-            db.session.add(
-                UserScheduleEntry(
-                    user_id=user.id,
-                    section_id=section.id,
-                    term=section.term,
-                    is_current_term=True,
-                )
-            )
+    initialize_user_courses(user.id, program.id, CURRENT_TERM)
+    refresh_token = start_refresh_session(user)
 
     db.session.commit()
 
-    token = generate_token(user)
-
-    return (
-        jsonify(
-            {
-                "token": token,
-                "user": user.to_dict(),
-            }
-        ),
-        201,
-    )
+    return _session_response(user, refresh_token, 201)
 
 
 @auth_bp.route("/login", methods=["POST"])
@@ -100,9 +93,54 @@ def login():
     if not email or not password:
         return jsonify({"message": "Email and password are required"}), 400
 
+    hasher = get_password_hasher()
     user = User.query.filter_by(email=email).first()
-    if not user or not check_password_hash(user.password_hash, password):
+    if not user or not hasher.verify(user.password_hash, password):
         return jsonify({"message": "Invalid credentials"}), 401
 
-    token = generate_token(user)
-    return jsonify({"token": token, "user": user.to_dict()}), 200
+    if hasher.needs_rehash(user.password_hash):
+        user.password_hash = hasher.hash(password)
+    refresh_token = start_refresh_session(user)
+    db.session.commit()
+
+    return _session_response(user, refresh_token, 200)
+
+
+def _refresh_token_payload():
+    payload = request.get_json() or {}
+    refresh_token = payload.get("refreshToken")
+    if not isinstance(refresh_token, str) or not refresh_token:
+        return None
+    return refresh_token
+
+
+@auth_bp.route("/refresh", methods=["POST"])
+def refresh():
+    """Trade a refresh token for a new access token and the next refresh token.
+
+    Each refresh token works once; the one presented here stops working.
+    """
+    refresh_token = _refresh_token_payload()
+    if refresh_token is None:
+        return jsonify({"message": "refreshToken is required"}), 400
+
+    rotated = rotate_refresh_token(refresh_token)
+    # Commits the revocation of a reused chain too.
+    db.session.commit()
+    if rotated is None:
+        return jsonify({"message": "Invalid or expired refresh token"}), 401
+
+    user, next_token = rotated
+    return _session_response(user, next_token, 200)
+
+
+@auth_bp.route("/logout", methods=["POST"])
+def logout():
+    """Revoke the refresh token's session; access tokens simply expire."""
+    refresh_token = _refresh_token_payload()
+    if refresh_token is None:
+        return jsonify({"message": "refreshToken is required"}), 400
+
+    revoke_refresh_token(refresh_token)
+    db.session.commit()
+    return jsonify({"message": "Logged out"}), 200
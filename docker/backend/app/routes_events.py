@@ -0,0 +1,60 @@
+from datetime import date
+
+from flask import Blueprint, jsonify, request
+
+from catalog import get_catalog
+from event_index import campus_today, get_event_index
+from http_cache import conditional, events_etag
+
+events_bp = Blueprint("events", __name__, url_prefix="/events")
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def _parse_date(value: str):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+@events_bp.route("", methods=["GET"])
+@conditional(events_etag, cache_control="public, no-cache")
+def list_events():
+    """Events dated in [from, to] (ISO dates; ``from`` defaults to today), soonest first.
+
+    Global events are always included; ``program`` adds that program's events.
+    """
+    start = campus_today()
+    if request.args.get("from"):
+        start = _parse_date(request.args["from"])
+        if start is None:
+            return jsonify({"message": "from must be an ISO date (YYYY-MM-DD)"}), 400
+
+    end = None
+    if request.args.get("to"):
+        end = _parse_date(request.args["to"])
+        if end is None:
+            return jsonify({"message": "to must be an ISO date (YYYY-MM-DD)"}), 400
+        if end < start:
+            return jsonify({"message": "to must not be before from"}), 400
+
+    limit = DEFAULT_LIMIT
+    if "limit" in request.args:
+        try:
+            limit = int(request.args["limit"])
+        except ValueError:
+            limit = None
+    if limit is None or not 1 <= limit <= MAX_LIMIT:
+        return jsonify({"message": f"limit must be between 1 and {MAX_LIMIT}"}), 400
+
+    program_id = None
+    if request.args.get("program"):
+        program = get_catalog().by_code.get(request.args["program"])
+        if program is None:
+            return jsonify({"message": "Program not found"}), 404
+        program_id = program.id
+
+    records = get_event_index().between(program_id, start, end, limit)
+    return jsonify([record.to_dict() for record in records]), 200
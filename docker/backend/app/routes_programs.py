@@ -1,20 +1,103 @@
-from flask import Blueprint, jsonify
+import base64
+import binascii
+import json
 
-from models import Program
+from flask import Blueprint, jsonify, request
+
+from catalog import get_catalog
+from http_cache import catalog_etag, conditional
 
 programs_bp = Blueprint("programs", __name__, url_prefix="/programs")
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+SUMMARY_FIELDS = (
+    "id",
+    "code",
+    "name",
+    "jornada",
+    "sedes",
+    "degree",
+    "lastUpdated",
+    "totalCredits",
+    "numberOfSemesters",
+)
+
+# Any of these switches the listing to the paginated {items, nextCursor} form.
+_LIST_PARAMS = {"limit", "cursor", "fields", "q", "jornada", "sede", "degree"}
+
+
+def _encode_cursor(key) -> str:
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        name, code = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        return None
+    if not isinstance(name, str) or not isinstance(code, str):
+        return None
+    return (name, code)
+
 
 @programs_bp.route("", methods=["GET"])
+@conditional(catalog_etag, cache_control="public, no-cache")
 def list_programs():
-    programs = Program.query.order_by(Program.name.asc()).all()
-    return jsonify([program.to_dict(include_blocks=False) for program in programs]), 200
+    catalog = get_catalog()
+    if not _LIST_PARAMS & request.args.keys():
+        # Unparameterized: every summary, served from the precomputed body.
+        return catalog.summaries_response()
+
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    if limit is None or not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({"message": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+
+    fields = None
+    if request.args.get("fields"):
+        fields = [field.strip() for field in request.args["fields"].split(",") if field.strip()]
+        invalid = [field for field in fields if field not in SUMMARY_FIELDS]
+        if invalid or not fields:
+            return jsonify({"message": "Unknown fields", "invalid": invalid}), 400
+
+    after = None
+    if request.args.get("cursor"):
+        after = _decode_cursor(request.args["cursor"])
+        if after is None:
+            return jsonify({"message": "Invalid cursor"}), 400
+
+    records, next_key = catalog.search_programs(
+        limit,
+        after=after,
+        prefix=request.args.get("q", "").strip() or None,
+        jornada=request.args.get("jornada"),
+        sede=request.args.get("sede"),
+        degree=request.args.get("degree"),
+    )
+
+    items = [record.to_dict() for record in records]
+    if fields:
+        items = [{field: item[field] for field in fields} for item in items]
+
+    return (
+        jsonify(
+            {
+                "items": items,
+                "nextCursor": _encode_cursor(next_key) if next_key else None,
+            }
+        ),
+        200,
+    )
 
 
 @programs_bp.route("/<program_code>", methods=["GET"])
+@conditional(catalog_etag, cache_control="public, no-cache")
 def get_program(program_code: str):
-    program = Program.query.filter_by(code=program_code).first()
-    if not program:
+    response = get_catalog().program_response(program_code)
+    if response is None:
         return jsonify({"message": "Program not found"}), 404
 
-    return jsonify(program.to_dict(include_blocks=True)), 200
+    return response
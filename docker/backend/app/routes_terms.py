@@ -0,0 +1,70 @@
+import re
+
+from flask import Blueprint, jsonify, request
+
+from http_cache import conditional, term_sections_etag
+from json_provider import stream_json_array
+from section_index import DAY_INDEX, DAYS, MATCH_MODES, MATCH_WITHIN, get_term_sections
+
+terms_bp = Blueprint("terms", __name__, url_prefix="/terms")
+
+_TIME_PATTERN = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)$")
+_DAYS_BY_FOLDED_NAME = {day.casefold(): index for day, index in DAY_INDEX.items()}
+
+
+def _parse_minute(value: str):
+    if value == "24:00":
+        return 24 * 60
+    match = _TIME_PATTERN.match(value)
+    if not match:
+        return None
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+@terms_bp.route("/<term>/sections", methods=["GET"])
+@conditional(term_sections_etag, cache_control="public, no-cache")
+def list_term_sections(term: str):
+    """Sections offered in ``term``, filtered by course, professor, day and time window.
+
+    ``course`` may repeat or hold comma-separated codes; ``from``/``to`` are HH:MM.
+    ``match=within`` (default) keeps sections with a meeting inside the window,
+    ``match=overlaps`` those with a meeting touching it.
+    """
+    course_codes = None
+    if "course" in request.args:
+        course_codes = [
+            code.strip()
+            for value in request.args.getlist("course")
+            for code in value.split(",")
+            if code.strip()
+        ]
+
+    day_index = None
+    if request.args.get("day"):
+        day_index = _DAYS_BY_FOLDED_NAME.get(request.args["day"].strip().casefold())
+        if day_index is None:
+            return jsonify({"message": "Invalid day", "allowed": list(DAYS)}), 400
+
+    window = {}
+    for param in ("from", "to"):
+        if request.args.get(param):
+            window[param] = _parse_minute(request.args[param].strip())
+            if window[param] is None:
+                return jsonify({"message": f"{param} must be a time in HH:MM format"}), 400
+    start, end = window.get("from"), window.get("to")
+    if start is not None and end is not None and start >= end:
+        return jsonify({"message": "from must be earlier than to"}), 400
+
+    match = request.args.get("match", MATCH_WITHIN)
+    if match not in MATCH_MODES:
+        return jsonify({"message": "Invalid match value", "allowed": sorted(MATCH_MODES)}), 400
+
+    sections = get_term_sections(term).query(
+        course_codes=course_codes,
+        professor=request.args.get("professor", "").strip() or None,
+        day_index=day_index,
+        start=start,
+        end=end,
+        match=match,
+    )
+    return stream_json_array(section.to_dict() for section in sections)
@@ -1,23 +1,47 @@
-from flask import Blueprint, g, jsonify, request
-
-from auth_utils import auth_required
-from extensions import db
+from datetime import datetime
+
+from flask import Blueprint, current_app, g, jsonify, request
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import joinedload
+
+from auth_utils import auth_required, invalidate_cached_user, load_current_user
+from catalog import get_program
+from event_index import campus_today, get_event_index
+from http_cache import conditional, user_etag, user_events_etag, user_schedule_etag
+from extensions import db, upsert_insert
+from json_provider import stream_json_array
 from models import (
-    AcademicEvent,
     Course,
+    CourseBlock,
     CourseSection,
     Program,
     User,
     UserCourseStatus,
     UserScheduleEntry,
 )
-from seed_data import CURRENT_TERM
+from prerequisites import get_graph
+from progress import (
+    apply_status_change,
+    apply_status_changes,
+    calculate_progress,
+    lock_progress,
+)
+from schedule_engine import OBJECTIVE_CREDITS, OBJECTIVES, suggest_schedules
+from schedule_occupancy import load_occupancy, lock_user_revision, section_mask, store_occupancy
+from section_index import get_term_sections
+from seed_data import CURRENT_TERM, NEXT_TERM
+from user_init import reset_user_courses
 
 users_bp = Blueprint("users", __name__, url_prefix="/users")
 
+UPCOMING_EVENTS = 10
+# Above any real term load; larger maxCredits values are clamped to it.
+SUGGESTION_MAX_CREDITS = 60
+
 
 @users_bp.route("/me", methods=["GET"])
 @auth_required
+@conditional(user_etag)
 def get_profile():
     return jsonify(g.current_user.to_dict()), 200
 
@@ -25,7 +49,9 @@ def get_profile():
 @users_bp.route("/me", methods=["PUT"])
 @auth_required
 def update_profile():
-    user = g.current_user
+    user = load_current_user()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
     payload = request.get_json() or {}
 
     name = payload.get("name")
@@ -48,64 +74,68 @@ def update_profile():
         user.program = new_program
 
         # Reset course statuses for the new program
-        UserCourseStatus.query.filter_by(user_id=user.id).delete(synchronize_session=False)
-        UserScheduleEntry.query.filter_by(user_id=user.id).delete(synchronize_session=False)
         db.session.flush()
-        statuses = [
-            UserCourseStatus(
-                user_id=user.id,
-                course_id=course.id,
-                status=course.default_status or "not-coursed",
-            )
-            for course in new_program.courses
-        ]
-        db.session.bulk_save_objects(statuses)
-
-        in_progress_course_ids = [
-            course.id for course in new_program.courses if course.default_status == "in-progress"
-        ]
-        if in_progress_course_ids:
-            sections = CourseSection.query.filter(
-                CourseSection.course_id.in_(in_progress_course_ids),
-                CourseSection.term == CURRENT_TERM,
-            ).all()
-            for section in sections:
-                db.session.add(
-                    UserScheduleEntry(
-                        user_id=user.id,
-                        section_id=section.id,
-                        term=section.term,
-                        is_current_term=True,
-                    )
-                )
+        reset_user_courses(user.id, new_program.id, CURRENT_TERM)
 
+    User.bump_revision(user.id)
     db.session.commit()
+    invalidate_cached_user(user.id)
     return jsonify(user.to_dict()), 200
 
 
 @users_bp.route("/me/course-status", methods=["GET"])
 @auth_required
+@conditional(user_etag)
 def list_course_statuses():
     user = g.current_user
-    statuses = (
-        UserCourseStatus.query.join(Course)
-        .filter(UserCourseStatus.user_id == user.id)
+    rows = db.session.execute(
+        select(
+            Course.id,
+            Course.code,
+            Course.name,
+            Course.credits,
+            Course.hours,
+            Course.requisitos,
+            Course.correquisitos,
+            Course.default_status,
+            CourseBlock.block_number,
+            UserCourseStatus.status,
+        )
+        .join(UserCourseStatus, UserCourseStatus.course_id == Course.id)
+        .outerjoin(CourseBlock, Course.block_id == CourseBlock.id)
+        .where(UserCourseStatus.user_id == user.id)
         .order_by(Course.code)
-        .all()
     )
 
-    response = []
-    for status in statuses:
-        course = status.course
-        block_number = course.block.block_number if course.block else None
-        response.append(
-            {
-                "course": course.to_dict(),
-                "status": status.status,
-                "blockNumber": block_number,
-            }
-        )
-    return jsonify(response), 200
+    # Encoded straight from the row tuples, a chunk at a time.
+    return stream_json_array(
+        {
+            "course": {
+                "id": course_id,
+                "code": code,
+                "name": name,
+                "credits": credits,
+                "hours": hours,
+                "requirements": requirements,
+                "corequisites": corequisites,
+                "defaultStatus": default_status,
+            },
+            "status": status,
+            "blockNumber": block_number,
+        }
+        for (
+            course_id,
+            code,
+            name,
+            credits,
+            hours,
+            requirements,
+            corequisites,
+            default_status,
+            block_number,
+            status,
+        ) in rows
+    )
 
 
 @users_bp.route("/me/course-status/<course_code>", methods=["PUT"])
@@ -118,14 +148,22 @@ def update_course_status(course_code: str):
     if new_status not in UserCourseStatus.VALID_STATUSES:
         return jsonify({"message": "Invalid status value"}), 400
 
-    course = Course.query.filter_by(code=course_code).first()
+    course = (
+        db.session.query(Course.id, Course.credits, CourseBlock.block_number)
+        .outerjoin(CourseBlock, Course.block_id == CourseBlock.id)
+        .filter(Course.code == course_code)
+        .first()
+    )
     if not course:
         return jsonify({"message": "Course not found"}), 404
 
+    # Serializes status writes for this user before the old status is read.
+    lock_progress(user.id)
     status_record = UserCourseStatus.query.filter_by(
         user_id=user.id, course_id=course.id
     ).first()
 
+    old_status = status_record.status if status_record else None
     if not status_record:
         status_record = UserCourseStatus(
             user_id=user.id,
@@ -136,41 +174,144 @@ def update_course_status(course_code: str):
     else:
         status_record.status = new_status
 
+    apply_status_change(user.id, course.credits, course.block_number, old_status, new_status)
+
+    User.bump_revision(user.id)
     db.session.commit()
     return jsonify({"message": "Status updated"}), 200
 
 
-def _calculate_progress(user) -> dict:
-    program = user.program
-    total_credits = program.total_credits if program else 0
-    approved_statuses = [
-        status for status in user.course_statuses if status.status == "approved"
-    ]
-    completed_credits = sum(status.course.credits for status in approved_statuses)
+@users_bp.route("/me/course-status", methods=["PATCH"])
+@auth_required
+def update_course_statuses():
+    user = g.current_user
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, list) or not payload:
+        return jsonify({"message": "Expected a non-empty list of {code, status}"}), 400
+
+    requested = {}
+    invalid = []
+    for item in payload:
+        code = item.get("code") if isinstance(item, dict) else None
+        status = item.get("status") if isinstance(item, dict) else None
+        if not code or status not in UserCourseStatus.VALID_STATUSES:
+            invalid.append(item)
+            continue
+        requested[code] = status
+    if invalid:
+        return jsonify({"message": "Invalid status value", "invalid": invalid}), 400
+
+    courses = {
+        code: (course_id, credits, block_number)
+        for code, course_id, credits, block_number in db.session.query(
+            Course.code, Course.id, Course.credits, CourseBlock.block_number
+        )
+        .outerjoin(CourseBlock, Course.block_id == CourseBlock.id)
+        .filter(Course.code.in_(requested))
+        .all()
+    }
+    missing = sorted(set(requested) - set(courses))
+    if missing:
+        return jsonify({"message": "Course not found", "missing": missing}), 404
+
+    course_ids = [course_id for course_id, _, _ in courses.values()]
+    # Serializes status writes for this user before the old statuses are read.
+    lock_progress(user.id)
+    old_statuses = dict(
+        db.session.query(UserCourseStatus.course_id, UserCourseStatus.status)
+        .filter(
+            UserCourseStatus.user_id == user.id,
+            UserCourseStatus.course_id.in_(course_ids),
+        )
+        .all()
+    )
 
-    progress_percentage = (
-        round((completed_credits / total_credits) * 100)
-        if total_credits
-        else 0
+    _upsert_statuses(
+        user.id,
+        {courses[code][0]: status for code, status in requested.items()},
+        old_statuses,
+    )
+    apply_status_changes(
+        user.id,
+        [
+            (credits, block_number, old_statuses.get(course_id), requested[code])
+            for code, (course_id, credits, block_number) in courses.items()
+        ],
     )
+    User.bump_revision(user.id)
+    db.session.commit()
 
-    current_block = 0
-    for status in user.course_statuses:
-        if status.status in {"approved", "in-progress"} and status.course.block:
-            current_block = max(current_block, status.course.block.block_number)
+    return jsonify({"updated": len(requested), "progress": calculate_progress(user)}), 200
 
-    current_semester = max(current_block, 1)
-    remaining_semesters = max(
-        (program.number_of_semesters or current_semester) - current_semester, 0
+
+def _upsert_statuses(user_id: int, new_statuses: dict, old_statuses: dict):
+    """Write course id -> status for the user as one upsert statement."""
+    now = datetime.utcnow()
+    rows = [
+        {"user_id": user_id, "course_id": course_id, "status": status, "updated_at": now}
+        for course_id, status in new_statuses.items()
+    ]
+    statement = upsert_insert(UserCourseStatus.__table__)
+    if statement is not None:
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "course_id"],
+            set_={
+                "status": statement.excluded.status,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+        db.session.execute(statement, rows)
+        return
+
+    updates = [row for row in rows if row["course_id"] in old_statuses]
+    inserts = [row for row in rows if row["course_id"] not in old_statuses]
+    if updates:
+        db.session.execute(
+            update(UserCourseStatus.__table__)
+            .where(
+                UserCourseStatus.user_id == bindparam("b_user_id"),
+                UserCourseStatus.course_id == bindparam("b_course_id"),
+            )
+            .values(status=bindparam("status"), updated_at=bindparam("updated_at")),
+            [
+                {"b_user_id": row["user_id"], "b_course_id": row["course_id"], **row}
+                for row in updates
+            ],
+        )
+    if inserts:
+        db.session.execute(insert(UserCourseStatus.__table__), inserts)
+
+
+def _load_statuses(user) -> dict:
+    """Map course id -> status for all of the user's courses in one query."""
+    return dict(
+        db.session.query(UserCourseStatus.course_id, UserCourseStatus.status)
+        .filter(UserCourseStatus.user_id == user.id)
+        .all()
     )
 
-    return {
-        "progress": progress_percentage,
-        "completedCredits": completed_credits,
-        "totalCredits": total_credits,
-        "currentSemester": current_semester,
-        "remainingSemesters": remaining_semesters,
-    }
+
+def _eligible_codes(user, statuses=None) -> set:
+    """Return the codes of courses whose prerequisites the user has approved."""
+    if not user.program_id:
+        return set()
+    if statuses is None:
+        statuses = _load_statuses(user)
+    graph = get_graph(user.program_id)
+    approved = graph.status_mask(statuses, {"approved"})
+    in_progress = graph.status_mask(statuses, {"in-progress"})
+    return set(graph.codes_for(graph.eligible_mask(approved) & ~in_progress))
+
+
+def _load_schedule_entries(user, current_only: bool = False) -> list:
+    """Load the user's schedule entries with sections, courses and meetings eagerly."""
+    query = UserScheduleEntry.query.options(
+        joinedload(UserScheduleEntry.section).joinedload(CourseSection.course),
+        joinedload(UserScheduleEntry.section).selectinload(CourseSection.meetings),
+    ).filter(UserScheduleEntry.user_id == user.id)
+    if current_only:
+        query = query.filter(UserScheduleEntry.is_current_term.is_(True))
+    return query.order_by(UserScheduleEntry.id).all()
 
 
 def _serialize_schedule_entry(entry: UserScheduleEntry):
@@ -191,6 +332,7 @@ def _serialize_schedule_entry(entry: UserScheduleEntry):
         "code": section.course.code if section.course else None,
         "name": section.course.name if section.course else None,
         "term": entry.term,
+        "isCurrentTerm": entry.is_current_term,
         "section": section.section_code,
         "professor": section.professor,
         "location": section.location,
@@ -198,39 +340,33 @@ def _serialize_schedule_entry(entry: UserScheduleEntry):
     }
 
 
+def _upcoming_events(user, limit: int = UPCOMING_EVENTS) -> list:
+    """The next ``limit`` events of the user's program and global events, from today."""
+    records = get_event_index().upcoming(user.program_id, campus_today(), limit)
+    return [record.to_dict() for record in records]
+
+
 @users_bp.route("/me/dashboard", methods=["GET"])
 @auth_required
+@conditional(user_events_etag)
 def get_dashboard():
     user = g.current_user
-    progress = _calculate_progress(user)
+    progress = calculate_progress(user)
 
-    current_courses = [
-        entry
-        for entry in user.schedule_entries
-        if entry.is_current_term and entry.section is not None
-    ]
     serialized_courses = [
         data
-        for entry in current_courses
+        for entry in _load_schedule_entries(user, current_only=True)
         if (data := _serialize_schedule_entry(entry)) is not None
     ]
 
-    events = (
-        AcademicEvent.query.filter(
-            (AcademicEvent.program_id == None) | (AcademicEvent.program_id == user.program_id)
-        )
-        .order_by(AcademicEvent.event_date.asc())
-        .limit(10)
-        .all()
-    )
-
     return (
         jsonify(
             {
                 "user": user.to_dict(),
                 "progress": progress,
                 "currentCourses": serialized_courses,
-                "upcomingEvents": [event.to_dict() for event in events],
+                "upcomingEvents": _upcoming_events(user),
+                "eligibleCourses": sorted(_eligible_codes(user)),
             }
         ),
         200,
@@ -239,33 +375,152 @@ def get_dashboard():
 
 @users_bp.route("/me/schedule", methods=["GET"])
 @auth_required
+@conditional(user_schedule_etag)
 def get_schedule():
     user = g.current_user
     entries = [
-        _serialize_schedule_entry(entry)
-        for entry in user.schedule_entries
-        if entry.section is not None
+        _serialize_schedule_entry(entry) for entry in _load_schedule_entries(user)
     ]
     return jsonify([entry for entry in entries if entry is not None]), 200
 
 
-@users_bp.route("/me/curriculum", methods=["GET"])
+@users_bp.route("/me/schedule/<term>/sections", methods=["POST"])
 @auth_required
-def get_curriculum_with_status():
+def add_schedule_section(term: str):
+    """Add a section to the user's ``term`` schedule unless it clashes with one already there."""
     user = g.current_user
-    program = user.program
-    if not program:
-        return jsonify({"message": "Program not assigned"}), 400
+    payload = request.get_json() or {}
+    section_id = payload.get("sectionId")
+    if not isinstance(section_id, int) or isinstance(section_id, bool):
+        return jsonify({"message": "sectionId must be an integer"}), 400
+
+    index = get_term_sections(term)
+    record = index.section(section_id)
+    if record is None:
+        return jsonify({"message": "Section not found"}), 404
+    program = get_program(user.program_id)
+    if program is None or record.course_id not in program.course_ids:
+        return jsonify({"message": "Section's course is not in your program"}), 400
+
+    # The early returns below roll back to release the row lock taken here.
+    revision = lock_user_revision(user.id)
+    occupancy = load_occupancy(user.id, term, revision, index)
+    if section_id in occupancy.sections:
+        db.session.rollback()
+        return jsonify({"message": "Section already in schedule"}), 409
+    enrolled_section = occupancy.section_for_course(record.course_id)
+    if enrolled_section is not None:
+        db.session.rollback()
+        return (
+            jsonify({"message": "Course already in schedule", "sectionId": enrolled_section}),
+            409,
+        )
+
+    mask = section_mask(record)
+    conflicts = occupancy.conflicts(mask)
+    if conflicts:
+        db.session.rollback()
+        return (
+            jsonify(
+                {
+                    "message": "Schedule conflict",
+                    "conflicts": [index.section(conflict).to_dict() for conflict in conflicts],
+                }
+            ),
+            409,
+        )
+
+    db.session.add(
+        UserScheduleEntry(
+            user_id=user.id,
+            section_id=section_id,
+            term=term,
+            is_current_term=term == CURRENT_TERM,
+        )
+    )
+    User.bump_revision(user.id)
+    db.session.commit()
+    store_occupancy(
+        user.id, term, occupancy.with_section(revision + 1, section_id, record.course_id, mask)
+    )
+
+    return jsonify(record.to_dict()), 201
+
+
+@users_bp.route("/me/schedule/<term>/sections/<int:section_id>", methods=["DELETE"])
+@auth_required
+def remove_schedule_section(term: str, section_id: int):
+    user = g.current_user
+    index = get_term_sections(term)
+    revision = lock_user_revision(user.id)
+    occupancy = load_occupancy(user.id, term, revision, index)
+
+    deleted = db.session.execute(
+        delete(UserScheduleEntry).where(
+            UserScheduleEntry.user_id == user.id,
+            UserScheduleEntry.term == term,
+            UserScheduleEntry.section_id == section_id,
+        )
+    ).rowcount
+    if not deleted:
+        db.session.rollback()
+        return jsonify({"message": "Section not in schedule"}), 404
+
+    User.bump_revision(user.id)
+    db.session.commit()
+    store_occupancy(user.id, term, occupancy.without_section(revision + 1, section_id))
+
+    return jsonify({"message": "Section removed"}), 200
+
+
+@users_bp.route("/me/schedule/suggestions", methods=["GET"])
+@auth_required
+def get_schedule_suggestions():
+    user = g.current_user
+    objective = request.args.get("objective", OBJECTIVE_CREDITS)
+    if objective not in OBJECTIVES:
+        return jsonify({"message": "Invalid objective value"}), 400
+
+    max_results = current_app.config["SCHEDULE_SUGGESTIONS_MAX"]
+    limit = request.args.get("limit", 5, type=int)
+    max_credits = request.args.get("maxCredits", type=int)
+    if limit is None or limit < 1:
+        return jsonify({"message": "limit must be a positive integer"}), 400
+    if "maxCredits" in request.args:
+        if max_credits is None or max_credits < 1:
+            return jsonify({"message": "maxCredits must be a positive integer"}), 400
+        max_credits = min(max_credits, SUGGESTION_MAX_CREDITS)
+
+    result = suggest_schedules(
+        user,
+        NEXT_TERM,
+        objective=objective,
+        limit=min(limit, max_results),
+        max_credits=max_credits,
+        budget_ms=current_app.config["SCHEDULE_SEARCH_BUDGET_MS"],
+    )
+
+    return (
+        jsonify(
+            {
+                "term": NEXT_TERM,
+                "objective": objective,
+                "schedules": result.schedules,
+                "truncated": result.truncated,
+                "explored": result.explored,
+                "candidateCourses": result.candidate_courses,
+                "candidateSections": result.candidate_sections,
+            }
+        ),
+        200,
+    )
 
-    statuses_by_course = {
-        status.course_id: status.status for status in user.course_statuses
-    }
 
-    blocks = []
-    for block in sorted(program.course_blocks, key=lambda b: b.block_number):
-        courses = []
-        for course in sorted(block.courses, key=lambda c: c.code):
-            courses.append(
+def _curriculum_blocks(program, statuses_by_course: dict, eligible_codes: set) -> list:
+    return [
+        {
+            "blockNumber": block.block_number,
+            "courses": [
                 {
                     "code": course.code,
                     "name": course.name,
@@ -274,35 +529,98 @@ def get_curriculum_with_status():
                     "requirements": course.requisitos,
                     "corequisites": course.correquisitos,
                     "status": statuses_by_course.get(course.id, "not-coursed"),
+                    "eligible": course.code in eligible_codes,
                 }
-            )
-        blocks.append(
-            {
-                "blockNumber": block.block_number,
-                "courses": courses,
-            }
-        )
+                for course in block.courses
+            ],
+        }
+        for block in program.blocks
+    ]
 
-    progress = _calculate_progress(user)
+
+def _program_summary(program) -> dict:
+    return {
+        "code": program.code,
+        "name": program.name,
+        "jornada": program.jornada,
+        "degree": program.degree,
+        "sedes": list(program.sedes),
+        "lastUpdated": program.last_updated,
+        "totalCredits": program.total_credits,
+        "numberOfSemesters": program.number_of_semesters,
+    }
+
+
+@users_bp.route("/me/curriculum", methods=["GET"])
+@auth_required
+@conditional(user_etag)
+def get_curriculum_with_status():
+    user = g.current_user
+    program = get_program(user.program_id)
+    if not program:
+        return jsonify({"message": "Program not assigned"}), 400
+
+    statuses_by_course = _load_statuses(user)
+    eligible_codes = _eligible_codes(user, statuses_by_course)
 
     return (
         jsonify(
             {
-                "program": {
-                    "code": program.code,
-                    "name": program.name,
-                    "jornada": program.jornada,
-                    "degree": program.degree,
-                    "sedes": program.sedes,
-                    "lastUpdated": program.last_updated.isoformat()
-                    if program.last_updated
-                    else None,
-                    "totalCredits": program.total_credits,
-                    "numberOfSemesters": program.number_of_semesters,
-                },
-                "progress": progress,
-                "blocks": blocks,
+                "program": _program_summary(program),
+                "progress": calculate_progress(user),
+                "blocks": _curriculum_blocks(program, statuses_by_course, eligible_codes),
             }
         ),
         200,
     )
+
+
+BOOTSTRAP_SECTIONS = ("profile", "progress", "curriculum", "schedule", "events")
+
+
+@users_bp.route("/me/bootstrap", methods=["GET"])
+@auth_required
+@conditional(user_events_etag)
+def get_bootstrap():
+    """Everything the first screen needs in one response.
+
+    ``include`` is a comma-separated subset of ``BOOTSTRAP_SECTIONS`` (all by
+    default). Sections share their queries: statuses, progress and schedule
+    entries are loaded at most once per request. ``curriculum`` has the same
+    shape as ``/me/curriculum`` minus its ``progress``, and ``schedule`` the
+    same as ``/me/schedule``.
+    """
+    user = g.current_user
+    include = BOOTSTRAP_SECTIONS
+    if request.args.get("include"):
+        include = [part.strip() for part in request.args["include"].split(",") if part.strip()]
+        invalid = [part for part in include if part not in BOOTSTRAP_SECTIONS]
+        if invalid or not include:
+            return jsonify({"message": "Unknown include sections", "invalid": invalid}), 400
+
+    body = {}
+    if "profile" in include:
+        body["profile"] = user.to_dict()
+    if "progress" in include:
+        body["progress"] = calculate_progress(user)
+    if "curriculum" in include:
+        program = get_program(user.program_id)
+        if program is None:
+            body["curriculum"] = None
+        else:
+            statuses_by_course = _load_statuses(user)
+            eligible_codes = _eligible_codes(user, statuses_by_course)
+            body["curriculum"] = {
+                "program": _program_summary(program),
+                "blocks": _curriculum_blocks(program, statuses_by_course, eligible_codes),
+            }
+    if "schedule" in include:
+        body["schedule"] = [
+            data
+            for entry in _load_schedule_entries(user)
+            if (data := _serialize_schedule_entry(entry)) is not None
+        ]
+    if "events" in include:
+        body["events"] = _upcoming_events(user)
+
+    return jsonify(body), 200
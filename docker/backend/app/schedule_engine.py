@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import time as time_module
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from extensions import db
+from models import UserCourseStatus
+from prerequisites import get_graph
+from section_index import DAY_INDEX, MINUTES_PER_DAY, get_term_sections
+
+logger = logging.getLogger(__name__)
+
+DAY_MASK = (1 << MINUTES_PER_DAY) - 1
+
+OBJECTIVE_CREDITS = "credits"
+OBJECTIVE_GAPS = "gaps"
+OBJECTIVES = {OBJECTIVE_CREDITS, OBJECTIVE_GAPS}
+
+# Statuses that count as "will be done" when planning the next term.
+PLANNING_SATISFIED_STATUSES = {"approved", "in-progress"}
+
+# How many search nodes to expand between deadline checks.
+_DEADLINE_CHECK_INTERVAL = 256
+
+
+def interval_mask(day_index: int, start_minute: int, end_minute: int) -> int:
+    """Encode a half-open [start, end) minute interval on a weekday as a bitmask."""
+    if end_minute <= start_minute:
+        return 0
+    width = end_minute - start_minute
+    return ((1 << width) - 1) << (day_index * MINUTES_PER_DAY + start_minute)
+
+
+def gap_minutes(mask: int) -> int:
+    """Return the idle minutes between the first and last class of each day."""
+    total = 0
+    for day_index in range(len(DAY_INDEX)):
+        day_bits = (mask >> (day_index * MINUTES_PER_DAY)) & DAY_MASK
+        if not day_bits:
+            continue
+        first = (day_bits & -day_bits).bit_length() - 1
+        span = day_bits.bit_length() - first
+        total += span - day_bits.bit_count()
+    return total
+
+
+@dataclass
+class SectionOption:
+    section_id: int
+    course_id: int
+    course_code: str
+    course_name: str
+    credits: int
+    section_code: str
+    professor: Optional[str]
+    location: Optional[str]
+    term: str
+    mask: int = 0
+    meetings: List[Dict] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return {
+            "code": self.course_code,
+            "name": self.course_name,
+            "credits": self.credits,
+            "term": self.term,
+            "section": self.section_code,
+            "professor": self.professor,
+            "location": self.location,
+            "meetings": self.meetings,
+        }
+
+
+@dataclass
+class SearchResult:
+    schedules: List[Dict]
+    explored: int
+    truncated: bool
+    candidate_courses: int
+    candidate_sections: int
+
+
+def eligible_course_ids(user) -> List[int]:
+    """Return the ids of program courses the user may enroll in next term."""
+    graph = get_graph(user.program_id)
+    statuses = dict(
+        db.session.query(UserCourseStatus.course_id, UserCourseStatus.status)
+        .filter(UserCourseStatus.user_id == user.id)
+        .all()
+    )
+    satisfied = graph.status_mask(statuses, PLANNING_SATISFIED_STATUSES)
+    return graph.ids_for(graph.eligible_mask(satisfied))
+
+
+def load_section_options(term: str, course_ids: Iterable[int]) -> List[SectionOption]:
+    """Build options for the sections of ``course_ids`` in ``term`` from the section index."""
+    course_ids = set(course_ids)
+    if not course_ids:
+        return []
+
+    records = sorted(
+        (record for record in get_term_sections(term).sections if record.course_id in course_ids),
+        key=lambda record: record.id,
+    )
+
+    options: List[SectionOption] = []
+    for record in records:
+        option = SectionOption(
+            section_id=record.id,
+            course_id=record.course_id,
+            course_code=record.course_code,
+            course_name=record.course_name,
+            credits=record.credits,
+            section_code=record.section_code,
+            professor=record.professor,
+            location=record.location,
+            term=record.term,
+        )
+        usable = True
+        for meeting in record.meetings:
+            if meeting.day_index is None:
+                logger.warning(
+                    "Skipping section %s: unknown meeting day '%s'", record.id, meeting.day
+                )
+                usable = False
+                break
+            meeting_mask = interval_mask(meeting.day_index, meeting.start, meeting.end)
+            if option.mask & meeting_mask:
+                # A section whose own meetings overlap can never be scheduled sanely.
+                usable = False
+                break
+            option.mask |= meeting_mask
+            option.meetings.append(meeting.to_dict())
+        if usable:
+            options.append(option)
+    return options
+
+
+class ScheduleSearch:
+    """Branch-and-bound search for the top-K conflict-free schedules.
+
+    Courses are visited in order of fewest sections first; for each course the
+    search either picks one of its non-conflicting sections or skips the course.
+    Only maximal schedules (no skipped course still fits) are reported.
+    """
+
+    def __init__(
+        self,
+        options: Sequence[SectionOption],
+        objective: str = OBJECTIVE_CREDITS,
+        limit: int = 5,
+        max_credits: Optional[int] = None,
+        budget_ms: int = 250,
+    ):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective '{objective}'")
+
+        by_course: Dict[int, List[SectionOption]] = {}
+        for option in options:
+            by_course.setdefault(option.course_id, []).append(option)
+
+        self.groups: List[List[SectionOption]] = sorted(
+            by_course.values(), key=lambda group: (len(group), group[0].course_code)
+        )
+        self.credits = [group[0].credits for group in self.groups]
+        # remaining_credits[i] = credits still obtainable from groups i..n
+        self.remaining_credits = [0] * (len(self.groups) + 1)
+        for index in range(len(self.groups) - 1, -1, -1):
+            self.remaining_credits[index] = (
+                self.remaining_credits[index + 1] + self.credits[index]
+            )
+
+        self.objective = objective
+        self.limit = max(limit, 1)
+        self.max_credits = max_credits
+        self.budget_seconds = max(budget_ms, 1) / 1000.0
+
+        self._heap: List[Tuple[Tuple[int, int], int, Tuple[SectionOption, ...]]] = []
+        self._tiebreak = count()
+        self._explored = 0
+        self._deadline = 0.0
+        self._truncated = False
+
+    def _score(self, credits: int, mask: int) -> Tuple[int, int]:
+        gaps = gap_minutes(mask)
+        if self.objective == OBJECTIVE_CREDITS:
+            return credits, -gaps
+        return -gaps, credits
+
+    def _fits(self, credits: int, mask: int, group_index: int) -> bool:
+        if (
+            self.max_credits is not None
+            and credits + self.credits[group_index] > self.max_credits
+        ):
+            return False
+        return any(not (option.mask & mask) for option in self.groups[group_index])
+
+    def _record(self, chosen: List[SectionOption], skipped: List[int], credits: int, mask: int):
+        if not chosen:
+            return
+        if any(self._fits(credits, mask, group_index) for group_index in skipped):
+            return
+
+        entry = (self._score(credits, mask), next(self._tiebreak), tuple(chosen))
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+        elif entry[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def _bounded_out(self, index: int, credits: int) -> bool:
+        if self.objective != OBJECTIVE_CREDITS or len(self._heap) < self.limit:
+            return False
+        best_possible = credits + self.remaining_credits[index]
+        if self.max_credits is not None:
+            best_possible = min(best_possible, self.max_credits)
+        return best_possible < self._heap[0][0][0]
+
+    def _expand(self, index: int, chosen: List[SectionOption], skipped: List[int], credits: int, mask: int):
+        if self._truncated:
+            return
+
+        self._explored += 1
+        if (
+            self._explored % _DEADLINE_CHECK_INTERVAL == 0
+            and time_module.perf_counter() >= self._deadline
+        ):
+            self._truncated = True
+            return
+
+        if index == len(self.groups):
+            self._record(chosen, skipped, credits, mask)
+            return
+
+        if self._bounded_out(index, credits):
+            return
+
+        course_credits = self.credits[index]
+        if self.max_credits is None or credits + course_credits <= self.max_credits:
+            for option in self.groups[index]:
+                if option.mask & mask:
+                    continue
+                chosen.append(option)
+                self._expand(index + 1, chosen, skipped, credits + course_credits, mask | option.mask)
+                chosen.pop()
+                if self._truncated:
+                    return
+
+        skipped.append(index)
+        self._expand(index + 1, chosen, skipped, credits, mask)
+        skipped.pop()
+
+    def run(self) -> SearchResult:
+        self._deadline = time_module.perf_counter() + self.budget_seconds
+        self._expand(0, [], [], 0, 0)
+
+        if self._truncated:
+            logger.info(
+                "Schedule search hit its %.0fms budget after %d nodes",
+                self.budget_seconds * 1000,
+                self._explored,
+            )
+
+        ranked = sorted(self._heap, key=lambda entry: (entry[0], -entry[1]), reverse=True)
+        schedules = []
+        for _, _, chosen in ranked:
+            mask = 0
+            for option in chosen:
+                mask |= option.mask
+            schedules.append(
+                {
+                    "credits": sum(option.credits for option in chosen),
+                    "gapMinutes": gap_minutes(mask),
+                    "sections": [
+                        option.to_dict()
+                        for option in sorted(chosen, key=lambda option: option.course_code)
+                    ],
+                }
+            )
+
+        return SearchResult(
+            schedules=schedules,
+            explored=self._explored,
+            truncated=self._truncated,
+            candidate_courses=len(self.groups),
+            candidate_sections=sum(len(group) for group in self.groups),
+        )
+
+
+def suggest_schedules(
+    user,
+    term: str,
+    objective: str = OBJECTIVE_CREDITS,
+    limit: int = 5,
+    max_credits: Optional[int] = None,
+    budget_ms: int = 250,
+) -> SearchResult:
+    """Build the top ``limit`` conflict-free schedules for ``user`` in ``term``."""
+    options = load_section_options(term, eligible_course_ids(user))
+    search = ScheduleSearch(
+        options,
+        objective=objective,
+        limit=limit,
+        max_credits=max_credits,
+        budget_ms=budget_ms,
+    )
+    return search.run()
@@ -0,0 +1,150 @@
+"""Per-user weekly occupancy for conflict checks on schedule writes.
+
+A user's sections in a term are folded into one minute-resolution weekday
+bitmask (see ``schedule_engine.interval_mask``), so checking a new section is
+one AND per meeting instead of comparing meeting rows pairwise. Occupancies
+are cached per (user, term) and trusted only while the user's ``revision`` and
+the term's section index version match the ones they were built from.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import select
+
+from extensions import db
+from models import User, UserScheduleEntry
+from schedule_engine import interval_mask
+from section_index import SectionRecord, TermSections
+
+
+def section_mask(record: SectionRecord) -> int:
+    mask = 0
+    for meeting in record.meetings:
+        if meeting.day_index is not None:
+            mask |= interval_mask(meeting.day_index, meeting.start, meeting.end)
+    return mask
+
+
+@dataclass(frozen=True, slots=True)
+class Occupancy:
+    revision: int
+    index_version: str
+    mask: int
+    # section id -> (course id, meeting mask)
+    sections: Dict[int, Tuple[int, int]]
+
+    def conflicts(self, mask: int) -> List[int]:
+        """Section ids whose meetings intersect ``mask``."""
+        if not self.mask & mask:
+            return []
+        return [
+            section_id
+            for section_id, (_, section_bits) in self.sections.items()
+            if section_bits & mask
+        ]
+
+    def section_for_course(self, course_id: int) -> Optional[int]:
+        for section_id, (section_course_id, _) in self.sections.items():
+            if section_course_id == course_id:
+                return section_id
+        return None
+
+    def with_section(
+        self, revision: int, section_id: int, course_id: int, mask: int
+    ) -> "Occupancy":
+        sections = dict(self.sections)
+        sections[section_id] = (course_id, mask)
+        return Occupancy(revision, self.index_version, self.mask | mask, sections)
+
+    def without_section(self, revision: int, section_id: int) -> "Occupancy":
+        sections = {key: value for key, value in self.sections.items() if key != section_id}
+        mask = 0
+        for _, section_bits in sections.values():
+            mask |= section_bits
+        return Occupancy(revision, self.index_version, mask, sections)
+
+
+class OccupancyCache:
+    """Bounded LRU of occupancies keyed by (user id, term)."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[int, str], Occupancy]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, user_id: int, term: str, revision: int, index_version: str
+    ) -> Optional[Occupancy]:
+        with self._lock:
+            occupancy = self._entries.get((user_id, term))
+            if occupancy is None:
+                return None
+            if occupancy.revision != revision or occupancy.index_version != index_version:
+                del self._entries[(user_id, term)]
+                return None
+            self._entries.move_to_end((user_id, term))
+            return occupancy
+
+    def put(self, user_id: int, term: str, occupancy: Occupancy):
+        with self._lock:
+            self._entries[(user_id, term)] = occupancy
+            self._entries.move_to_end((user_id, term))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_occupancy_cache: Optional[OccupancyCache] = None
+_occupancy_cache_lock = threading.Lock()
+
+
+def get_occupancy_cache() -> OccupancyCache:
+    global _occupancy_cache
+    if _occupancy_cache is None:
+        with _occupancy_cache_lock:
+            if _occupancy_cache is None:
+                _occupancy_cache = OccupancyCache(current_app.config["SCHEDULE_CACHE_SIZE"])
+    return _occupancy_cache
+
+
+def load_occupancy(user_id: int, term: str, revision: int, index: TermSections) -> Occupancy:
+    """Return the user's occupancy for ``term`` at ``revision``, from cache or the DB."""
+    cache = get_occupancy_cache()
+    occupancy = cache.get(user_id, term, revision, index.version)
+    if occupancy is not None:
+        return occupancy
+
+    section_ids = db.session.execute(
+        select(UserScheduleEntry.section_id).where(
+            UserScheduleEntry.user_id == user_id, UserScheduleEntry.term == term
+        )
+    ).scalars()
+    mask = 0
+    sections: Dict[int, Tuple[int, int]] = {}
+    for section_id in section_ids:
+        record = index.section(section_id)
+        if record is not None:
+            bits = section_mask(record)
+            sections[section_id] = (record.course_id, bits)
+            mask |= bits
+    occupancy = Occupancy(
+        revision=revision, index_version=index.version, mask=mask, sections=sections
+    )
+    cache.put(user_id, term, occupancy)
+    return occupancy
+
+
+def store_occupancy(user_id: int, term: str, occupancy: Occupancy):
+    """Cache the occupancy produced by a write; call after the write is committed."""
+    get_occupancy_cache().put(user_id, term, occupancy)
+
+
+def lock_user_revision(user_id: int) -> int:
+    """Read the user's revision, locking the row so schedule writes for one user serialize."""
+    return db.session.execute(
+        select(User.revision).where(User.id == user_id).with_for_update()
+    ).scalar_one()
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, time
+from functools import lru_cache
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+import click
+from sqlalchemy import delete, insert, select, tuple_, update
+
+from extensions import db, upsert_insert
+from models import Course, CourseMeeting, CourseSection
+from section_index import mark_term_changed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+_READ_CHUNK = 64 * 1024
+
+
+@dataclass
+class SectionOffering:
+    course_code: str
+    section_code: str
+    professor: Optional[str]
+    location: Optional[str]
+    # (day, start, end) tuples
+    meetings: List[Tuple[str, time, time]]
+
+
+@dataclass
+class ImportResult:
+    sections: int = 0
+    meetings: int = 0
+    skipped: int = 0
+
+
+@lru_cache(maxsize=4096)
+def parse_time(value: str) -> time:
+    """Parse an "HH:MM" string; offering files repeat a few dozen distinct times."""
+    return datetime.strptime(value, "%H:%M").time()
+
+
+def iter_json_array(handle: IO[str]) -> Iterator[Dict]:
+    """Yield the items of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    exhausted = False
+
+    while True:
+        # Skip whitespace and separators between items.
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or exhausted:
+                break
+            chunk = handle.read(_READ_CHUNK)
+            exhausted = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
+        if position >= len(buffer):
+            if started:
+                raise ValueError("Unexpected end of JSON array")
+            return
+
+        if not started:
+            if buffer[position] != "[":
+                raise ValueError("Section offerings must be a JSON array")
+            started = True
+            position += 1
+            continue
+
+        if buffer[position] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+            chunk = handle.read(_READ_CHUNK)
+            exhausted = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        yield item
+        position = end
+
+
+def _offerings_from_json(handle: IO[str]) -> Iterator[SectionOffering]:
+    # Files without explicit section codes are numbered by position, like the
+    # original seed did, so re-imports map onto the same rows.
+    for index, payload in enumerate(iter_json_array(handle), start=1):
+        yield SectionOffering(
+            course_code=payload.get("code"),
+            section_code=str(payload.get("section") or f"{index:02d}"),
+            professor=payload.get("professor"),
+            location=payload.get("location") or None,
+            meetings=[
+                (meeting["day"], parse_time(meeting["startTime"]), parse_time(meeting["endTime"]))
+                for meeting in payload.get("sections", [])
+            ],
+        )
+
+
+def _offerings_from_csv(handle: IO[str]) -> Iterator[SectionOffering]:
+    """One row per meeting: code, section, professor, location, day, startTime, endTime.
+
+    Rows of the same section must be contiguous.
+    """
+    reader = csv.DictReader(handle)
+    for (code, section_code), rows in groupby(reader, key=lambda row: (row["code"], row["section"])):
+        rows = list(rows)
+        first = rows[0]
+        yield SectionOffering(
+            course_code=code,
+            section_code=section_code,
+            professor=first.get("professor") or None,
+            location=first.get("location") or None,
+            meetings=[
+                (row["day"], parse_time(row["startTime"]), parse_time(row["endTime"]))
+                for row in rows
+                if row.get("day")
+            ],
+        )
+
+
+def iter_offerings(handle: IO[str], fmt: str) -> Iterator[SectionOffering]:
+    if fmt == "json":
+        return _offerings_from_json(handle)
+    if fmt == "csv":
+        return _offerings_from_csv(handle)
+    raise ValueError(f"Unsupported offerings format '{fmt}'")
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _upsert_sections(rows: List[Dict]) -> Dict[Tuple[int, str], int]:
+    """Insert or update sections keyed on (course, term, section_code); return their ids."""
+    # executemany + RETURNING is batched into multi-row statements by SQLAlchemy.
+    statement = upsert_insert(CourseSection.__table__)
+    if statement is not None:
+        statement = statement.on_conflict_do_update(
+            index_elements=["course_id", "term", "section_code"],
+            set_={
+                "professor": statement.excluded.professor,
+                "location": statement.excluded.location,
+            },
+        ).returning(CourseSection.id, CourseSection.course_id, CourseSection.section_code)
+        result = db.session.execute(statement, rows)
+        return {(course_id, section_code): section_id for section_id, course_id, section_code in result}
+
+    # Portable fallback: update the rows that exist, then insert the rest.
+    term = rows[0]["term"]
+    keys = [(row["course_id"], row["section_code"]) for row in rows]
+    existing = {
+        (course_id, section_code): section_id
+        for section_id, course_id, section_code in db.session.execute(
+            select(CourseSection.id, CourseSection.course_id, CourseSection.section_code).where(
+                CourseSection.term == term,
+                tuple_(CourseSection.course_id, CourseSection.section_code).in_(keys),
+            )
+        )
+    }
+    updates = [
+        {"id": existing[(row["course_id"], row["section_code"])], **row}
+        for row in rows
+        if (row["course_id"], row["section_code"]) in existing
+    ]
+    inserts = [row for row in rows if (row["course_id"], row["section_code"]) not in existing]
+    if updates:
+        db.session.execute(update(CourseSection), updates)
+    if inserts:
+        db.session.execute(insert(CourseSection.__table__), inserts)
+        existing.update(
+            {
+                (course_id, section_code): section_id
+                for section_id, course_id, section_code in db.session.execute(
+                    select(CourseSection.id, CourseSection.course_id, CourseSection.section_code).where(
+                        CourseSection.term == term,
+                        tuple_(CourseSection.course_id, CourseSection.section_code).in_(
+                            [(row["course_id"], row["section_code"]) for row in inserts]
+                        ),
+                    )
+                )
+            }
+        )
+    return existing
+
+
+def _copy_meetings(rows: List[Tuple[int, str, time, time]]):
+    """Stream meetings through PostgreSQL COPY on the session's own connection."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for section_id, day, start, end in rows:
+        writer.writerow((section_id, day, start.strftime("%H:%M"), end.strftime("%H:%M")))
+    buffer.seek(0)
+
+    dbapi_connection = db.session.connection().connection.dbapi_connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(
+            "COPY course_meetings (section_id, day_of_week, start_time, end_time) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def _replace_meetings(section_ids: List[int], rows: List[Tuple[int, str, time, time]]):
+    db.session.execute(delete(CourseMeeting).where(CourseMeeting.section_id.in_(section_ids)))
+    if not rows:
+        return
+    if db.session.get_bind().dialect.name == "postgresql":
+        _copy_meetings(rows)
+        return
+    db.session.execute(
+        insert(CourseMeeting.__table__),
+        [
+            {"section_id": section_id, "day_of_week": day, "start_time": start, "end_time": end}
+            for section_id, day, start, end in rows
+        ],
+    )
+
+
+def import_offerings(
+    offerings: Iterable[SectionOffering],
+    term: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> ImportResult:
+    """Upsert ``offerings`` for ``term`` in batches; meetings of touched sections are replaced.
+
+    The caller owns the transaction.
+    """
+    course_ids = dict(db.session.execute(select(Course.code, Course.id)).all())
+    result = ImportResult()
+    # Core inserts bypass the ORM flush events that normally track this.
+    mark_term_changed(db.session, term)
+
+    for batch in _batched(offerings, batch_size):
+        known = []
+        for offering in batch:
+            if offering.course_code in course_ids:
+                known.append(offering)
+            else:
+                result.skipped += 1
+        if not known:
+            continue
+
+        # Later rows win when a batch repeats a (course, section) key.
+        section_rows = {
+            (course_ids[offering.course_code], offering.section_code): {
+                "course_id": course_ids[offering.course_code],
+                "term": term,
+                "section_code": offering.section_code,
+                "professor": offering.professor,
+                "location": offering.location,
+            }
+            for offering in known
+        }
+        section_ids = _upsert_sections(list(section_rows.values()))
+
+        meetings = {}
+        for offering in known:
+            section_id = section_ids[(course_ids[offering.course_code], offering.section_code)]
+            meetings[section_id] = [
+                (section_id, day, start, end) for day, start, end in offering.meetings
+            ]
+        meeting_rows = [row for rows in meetings.values() for row in rows]
+        _replace_meetings(list(meetings), meeting_rows)
+
+        result.sections += len(section_rows)
+        result.meetings += len(meeting_rows)
+
+    return result
+
+
+def import_offerings_file(
+    path: Path,
+    term: str,
+    fmt: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> ImportResult:
+    fmt = fmt or path.suffix.lstrip(".").lower()
+    with path.open(encoding="utf-8", newline="") as handle:
+        return import_offerings(iter_offerings(handle, fmt), term, batch_size=batch_size)
+
+
+@click.command("import-sections")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--term", required=True, help="Term the offerings belong to, e.g. I-2025.")
+@click.option("--format", "fmt", type=click.Choice(["json", "csv"]), default=None)
+@click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True)
+def import_sections_command(path: Path, term: str, fmt: Optional[str], batch_size: int):
+    """Load a term's section offerings from a JSON or CSV file."""
+    started = datetime.now()
+    try:
+        result = import_offerings_file(path, term, fmt=fmt, batch_size=batch_size)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    elapsed = (datetime.now() - started).total_seconds()
+    logger.info(
+        "Imported %d sections and %d meetings for %s in %.2fs (%d skipped)",
+        result.sections,
+        result.meetings,
+        term,
+        elapsed,
+        result.skipped,
+    )
+    click.echo(
+        f"{term}: {result.sections} sections, {result.meetings} meetings, "
+        f"{result.skipped} skipped ({elapsed:.2f}s)"
+    )
@@ -0,0 +1,374 @@
+"""Per-term, in-memory index of course sections and their weekly meeting slots.
+
+Each term is loaded with one joined query into an immutable snapshot. Meetings
+are kept per weekday in arrays sorted by start minute, so "which sections meet
+on Tuesday between 13:00 and 17:00" is a bisect plus a short scan.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from cache_generation import bump_generation
+from extensions import db
+from models import Course, CourseMeeting, CourseSection
+
+logger = logging.getLogger(__name__)
+
+DAYS = ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo")
+DAY_INDEX = {day: index for index, day in enumerate(DAYS)}
+
+MINUTES_PER_DAY = 24 * 60
+
+MATCH_WITHIN = "within"
+MATCH_OVERLAPS = "overlaps"
+MATCH_MODES = {MATCH_WITHIN, MATCH_OVERLAPS}
+
+
+def format_minute(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+@dataclass(frozen=True, slots=True)
+class MeetingRecord:
+    day: str
+    # None when ``day`` is not a known weekday name; such meetings are not indexed.
+    day_index: Optional[int]
+    start: int
+    end: int
+
+    def to_dict(self) -> Dict:
+        return {
+            "day": self.day,
+            "startTime": format_minute(self.start),
+            "endTime": format_minute(self.end),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class SectionRecord:
+    id: int
+    course_id: int
+    course_code: str
+    course_name: str
+    credits: int
+    term: str
+    section_code: str
+    professor: Optional[str]
+    location: Optional[str]
+    meetings: Tuple[MeetingRecord, ...]
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "courseCode": self.course_code,
+            "courseName": self.course_name,
+            "credits": self.credits,
+            "term": self.term,
+            "section": self.section_code,
+            "professor": self.professor,
+            "location": self.location,
+            "meetings": [meeting.to_dict() for meeting in self.meetings],
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class DaySlots:
+    """One weekday's meetings as parallel arrays sorted by start minute."""
+
+    starts: Tuple[int, ...]
+    ends: Tuple[int, ...]
+    # Position of the owning section in ``TermSections.sections``.
+    positions: Tuple[int, ...]
+    # Longest meeting on this day; bounds how far back an overlapping start can be.
+    max_duration: int
+
+    def within(self, start: int, end: int) -> Iterable[int]:
+        """Sections with a meeting contained in [start, end)."""
+        for slot in range(bisect_left(self.starts, start), bisect_left(self.starts, end)):
+            if self.ends[slot] <= end:
+                yield self.positions[slot]
+
+    def overlapping(self, start: int, end: int) -> Iterable[int]:
+        """Sections with a meeting intersecting [start, end)."""
+        first = bisect_left(self.starts, start - self.max_duration + 1)
+        for slot in range(first, bisect_left(self.starts, end)):
+            if self.ends[slot] > start:
+                yield self.positions[slot]
+
+
+@dataclass(frozen=True, slots=True)
+class TermSections:
+    term: str
+    # Content digest; identical across processes that loaded the same rows.
+    version: str
+    # Ordered by course code, then section code.
+    sections: Tuple[SectionRecord, ...]
+    by_course_code: Dict[str, Tuple[int, ...]]
+    by_id: Dict[int, int]
+    days: Tuple[DaySlots, ...]
+
+    def section(self, section_id: int) -> Optional[SectionRecord]:
+        position = self.by_id.get(section_id)
+        return None if position is None else self.sections[position]
+
+    def query(
+        self,
+        course_codes: Optional[Iterable[str]] = None,
+        professor: Optional[str] = None,
+        day_index: Optional[int] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        match: str = MATCH_WITHIN,
+    ) -> List[SectionRecord]:
+        """Return sections matching every given filter, in index order.
+
+        With a day and/or time window, a section matches when one of its meetings
+        lies inside the window (``within``) or intersects it (``overlaps``).
+        """
+        candidates: Optional[Set[int]] = None
+
+        if course_codes is not None:
+            candidates = set()
+            for code in course_codes:
+                candidates.update(self.by_course_code.get(code.upper(), ()))
+
+        if day_index is not None or start is not None or end is not None:
+            start = 0 if start is None else start
+            end = MINUTES_PER_DAY if end is None else end
+            days = [self.days[day_index]] if day_index is not None else self.days
+            in_window: Set[int] = set()
+            for slots in days:
+                if match == MATCH_OVERLAPS:
+                    in_window.update(slots.overlapping(start, end))
+                else:
+                    in_window.update(slots.within(start, end))
+            candidates = in_window if candidates is None else candidates & in_window
+
+        positions = range(len(self.sections)) if candidates is None else sorted(candidates)
+        records = [self.sections[position] for position in positions]
+
+        if professor:
+            needle = professor.casefold()
+            records = [
+                record
+                for record in records
+                if record.professor and needle in record.professor.casefold()
+            ]
+        return records
+
+
+# Terms without sections (typos, probes, terms not imported yet) are cached
+# apart in a bounded LRU, so arbitrary term names cannot grow the index map.
+MISSED_TERMS_MAX = 256
+
+_indexes: Dict[str, TermSections] = {}
+_missed: "OrderedDict[str, TermSections]" = OrderedDict()
+# One lock per term being built; other terms stay readable meanwhile.
+_build_locks: Dict[str, threading.Lock] = {}
+_generation = 0
+# Guards the maps above; never held while querying the database.
+_index_lock = threading.Lock()
+
+
+def _minute_of(value) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _build(term: str) -> TermSections:
+    rows = db.session.execute(
+        select(
+            CourseSection.id,
+            CourseSection.course_id,
+            Course.code,
+            Course.name,
+            Course.credits,
+            CourseSection.section_code,
+            CourseSection.professor,
+            CourseSection.location,
+            CourseMeeting.day_of_week,
+            CourseMeeting.start_time,
+            CourseMeeting.end_time,
+        )
+        .join(Course, CourseSection.course_id == Course.id)
+        .outerjoin(CourseMeeting, CourseMeeting.section_id == CourseSection.id)
+        .where(CourseSection.term == term)
+        .order_by(Course.code, CourseSection.section_code, CourseMeeting.id)
+    )
+
+    sections: List[SectionRecord] = []
+    meetings: List[MeetingRecord] = []
+    current = None
+    for (
+        section_id,
+        course_id,
+        code,
+        name,
+        credits,
+        section_code,
+        professor,
+        location,
+        day,
+        start_time,
+        end_time,
+    ) in rows:
+        if current is None or current[0] != section_id:
+            if current is not None:
+                sections.append(SectionRecord(*current, meetings=tuple(meetings)))
+            current = (
+                section_id,
+                course_id,
+                code,
+                name,
+                credits or 0,
+                term,
+                section_code,
+                professor,
+                location,
+            )
+            meetings = []
+        if day is not None:
+            meetings.append(
+                MeetingRecord(day, DAY_INDEX.get(day), _minute_of(start_time), _minute_of(end_time))
+            )
+    if current is not None:
+        sections.append(SectionRecord(*current, meetings=tuple(meetings)))
+
+    by_course_code: Dict[str, List[int]] = {}
+    slots: List[List[Tuple[int, int, int]]] = [[] for _ in DAYS]
+    digest = hashlib.sha256(term.encode("utf-8"))
+    for position, section in enumerate(sections):
+        by_course_code.setdefault(section.course_code, []).append(position)
+        digest.update(repr(section).encode("utf-8"))
+        for meeting in section.meetings:
+            if meeting.day_index is not None:
+                slots[meeting.day_index].append((meeting.start, meeting.end, position))
+
+    days = []
+    for day_slots in slots:
+        day_slots.sort()
+        days.append(
+            DaySlots(
+                starts=tuple(slot[0] for slot in day_slots),
+                ends=tuple(slot[1] for slot in day_slots),
+                positions=tuple(slot[2] for slot in day_slots),
+                max_duration=max((end - start for start, end, _ in day_slots), default=0),
+            )
+        )
+
+    return TermSections(
+        term=term,
+        version=digest.hexdigest()[:16],
+        sections=tuple(sections),
+        by_course_code={code: tuple(positions) for code, positions in by_course_code.items()},
+        by_id={section.id: position for position, section in enumerate(sections)},
+        days=tuple(days),
+    )
+
+
+def _cached(term: str) -> Optional[TermSections]:
+    """Look ``term`` up in both maps; call with ``_index_lock`` held."""
+    index = _indexes.get(term)
+    if index is None:
+        index = _missed.get(term)
+        if index is not None:
+            _missed.move_to_end(term)
+    return index
+
+
+def get_term_sections(term: str) -> TermSections:
+    """Return the section index for ``term``, loading it on first use."""
+    index = _indexes.get(term)
+    if index is not None:
+        return index
+    with _index_lock:
+        index = _cached(term)
+        if index is not None:
+            return index
+        build_lock = _build_locks.setdefault(term, threading.Lock())
+
+    with build_lock:
+        # Another thread may have built the term while this one waited.
+        with _index_lock:
+            index = _cached(term)
+            if index is not None:
+                return index
+            generation = _generation
+        try:
+            index = _build(term)
+        finally:
+            with _index_lock:
+                if _build_locks.get(term) is build_lock:
+                    del _build_locks[term]
+
+        with _index_lock:
+            # A write that committed while we were loading leaves this snapshot stale.
+            if generation != _generation:
+                return index
+            if index.sections:
+                _indexes[term] = index
+            else:
+                _missed[term] = index
+                if len(_missed) > MISSED_TERMS_MAX:
+                    _missed.popitem(last=False)
+    if index.sections:
+        logger.info(
+            "Built section index for %s (%d sections, version %s)",
+            term,
+            len(index.sections),
+            index.version,
+        )
+    return index
+
+
+def invalidate(term: Optional[str] = None):
+    """Drop the index for ``term``, or for every term."""
+    global _generation
+    with _index_lock:
+        _generation += 1
+        if term is None:
+            _indexes.clear()
+            _missed.clear()
+        else:
+            _indexes.pop(term, None)
+            _missed.pop(term, None)
+
+
+def mark_term_changed(session, term: Optional[str]):
+    """Invalidate ``term`` once ``session`` commits (for writes that bypass the ORM)."""
+    session.info.setdefault("section_terms", set()).add(term)
+    bump_generation(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_section_writes(session, flush_context):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, CourseSection):
+            mark_term_changed(session, instance.term)
+        elif isinstance(instance, CourseMeeting):
+            mark_term_changed(session, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    terms = session.info.pop("section_terms", None)
+    if not terms:
+        return
+    if None in terms:
+        invalidate()
+    else:
+        for term in terms:
+            invalidate(term)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_tracked_terms(session):
+    session.info.pop("section_terms", None)
@@ -2,24 +2,27 @@ from __future__ import annotations
 
 import json
 import logging
-from datetime import date, datetime, time
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Sequence, Tuple
+from typing import List, Tuple
 
+import click
+from flask import current_app
 from werkzeug.security import generate_password_hash
 
 from extensions import db
+from migrations import migrate, setup_lock
 from models import (
     AcademicEvent,
     Course,
     CourseBlock,
-    CourseMeeting,
     CourseSection,
     Program,
     User,
-    UserCourseStatus,
-    UserScheduleEntry,
 )
+from prerequisites import compile_program
+from section_import import import_offerings_file
+from user_init import initialize_user_courses
 
 logger = logging.getLogger(__name__)
 
@@ -71,16 +74,13 @@ def _parse_iso_date(value: str) -> date:
     return datetime.fromisoformat(value).date()
 
 
-def _parse_time(value: str) -> time:
-    return datetime.strptime(value, "%H:%M").time()
-
-
 def seed_program() -> Program:
     payload = _load_json("program_data.json")
 
     program = Program.query.filter_by(code=payload["code"]).first()
     if program:
         logger.info("Program '%s' already present; skipping creation", program.code)
+        compile_program(program.id)
         return program
 
     block_count = 0
@@ -131,51 +131,19 @@ def seed_program() -> Program:
         block_count,
         course_count,
     )
+    compile_program(program.id)
     return program
 
 
-def _create_sections(course_map: Dict[str, Course], offerings: Sequence[Dict], term: str) -> int:
-    created = 0
-    for index, offering in enumerate(offerings, start=1):
-        course = course_map.get(offering.get("code"))
-        if not course:
-            continue
-
-        section = CourseSection(
-            course_id=course.id,
-            term=term,
-            section_code=f"{index:02d}",
-            professor=offering.get("professor"),
-            location=(offering.get("location") or None),
-        )
-        db.session.add(section)
-        db.session.flush()
-
-        for meeting in offering.get("sections", []):
-            db.session.add(
-                CourseMeeting(
-                    section_id=section.id,
-                    day_of_week=meeting["day"],
-                    start_time=_parse_time(meeting["startTime"]),
-                    end_time=_parse_time(meeting["endTime"]),
-                )
-            )
-
-        created += 1
-    return created
-
-
 def seed_course_sections(program: Program):
     if CourseSection.query.count() > 0:
         logger.info("Course sections already seeded; skipping creation")
         return
 
-    course_map = {course.code: course for course in program.courses}
-    current_offerings = _load_json("current_term_sections.json")
-    next_offerings = _load_json("next_term_sections.json")
-
-    created_current = _create_sections(course_map, current_offerings, CURRENT_TERM)
-    created_next = _create_sections(course_map, next_offerings, NEXT_TERM)
+    created_current = import_offerings_file(
+        DATA_DIR / "current_term_sections.json", CURRENT_TERM
+    ).sections
+    created_next = import_offerings_file(DATA_DIR / "next_term_sections.json", NEXT_TERM).sections
     db.session.commit()
     logger.info(
         "Seeded %d course sections (current term: %d, next term: %d)",
@@ -232,49 +200,6 @@ def _ensure_program(
     return program, next_index + 1
 
 
-def _seed_user_statuses(user: User, program: Program):
-    if not program.courses:
-        return
-
-    statuses = [
-        UserCourseStatus(
-            user_id=user.id,
-            course_id=course.id,
-            status=(course.default_status or "not-coursed"),
-        )
-        for course in program.courses
-    ]
-    if statuses:
-        db.session.bulk_save_objects(statuses)
-        db.session.flush()
-
-
-def _seed_user_schedule(user: User, program: Program):
-    in_progress_ids = [
-        course.id
-        for course in program.courses
-        if (course.default_status or "not-coursed") == "in-progress"
-    ]
-    if not in_progress_ids:
-        return
-
-    sections = CourseSection.query.filter(
-        CourseSection.course_id.in_(in_progress_ids),
-        CourseSection.term == CURRENT_TERM,
-    ).all()
-
-    for section in sections:
-        db.session.add(
-            UserScheduleEntry(
-                user_id=user.id,
-                section_id=section.id,
-                term=section.term,
-                is_current_term=True,
-            )
-        )
-    db.session.flush()
-
-
 def seed_demo_users(primary_program: Program):
     demo_users = _load_json("demo_users.json")
     next_index = 1
@@ -293,16 +218,21 @@ def seed_demo_users(primary_program: Program):
         user = User(
             name=entry["name"],
             email=email,
-            password_hash=generate_password_hash(entry["password"]),
+            password_hash=generate_password_hash(
+                entry["password"], current_app.config["PASSWORD_HASH_METHOD"]
+            ),
             carne=entry["carne"],
             program_id=program.id,
         )
         db.session.add(user)
         db.session.flush()
 
-        _seed_user_statuses(user, program)
-        if program.id == primary_program.id:
-            _seed_user_schedule(user, program)
+        initialize_user_courses(
+            user.id,
+            program.id,
+            CURRENT_TERM,
+            with_schedule=program.id == primary_program.id,
+        )
         created_count += 1
 
     db.session.commit()
@@ -328,13 +258,21 @@ def seed_initial_data():
 
 
 def bootstrap_database():
-    logger.info("Bootstrapping database (create tables + seed data)")
+    logger.info("Bootstrapping database (migrate + seed data)")
     try:
-        db.create_all()
-        seed_initial_data()
+        with setup_lock():
+            migrate()
+            seed_initial_data()
     except Exception as exc:
         logger.exception("Failed to bootstrap database: %s", exc)
         db.session.rollback()
         raise
     else:
         logger.info("Database bootstrap completed successfully")
+
+
+@click.command("seed")
+def seed_command():
+    """Apply schema migrations and load the catalog, sections, events and demo users."""
+    bootstrap_database()
+    click.echo("Database seeded")
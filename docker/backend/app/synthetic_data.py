@@ -0,0 +1,581 @@
+"""Deterministic, large synthetic datasets for load and scaling tests.
+
+``python manage.py generate-dataset --programs 50 --users 100000 --seed 7``
+adds ``SYN``-prefixed programs with prerequisite chains, sections with meetings
+for the current and next term, users with course-status histories and
+schedules, and academic events. The same seed, sizes and ``--anchor-date``
+always produce the same rows, so measurements taken on different commits
+compare like with like.
+
+Rows are written with Core ``executemany`` inserts and ids allocated here
+rather than by the database; the only read-back is the current term's section
+index, which keeps each user's schedule free of clashes. The writes bump the
+shared cache generation, so running servers pick up the new catalog, sections
+and events on their next generation check.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from datetime import time as clock
+from typing import Dict, List, Optional, Sequence
+
+import click
+from flask import current_app
+from sqlalchemy import func, insert, select, text
+from werkzeug.security import generate_password_hash
+
+import catalog
+from event_index import campus_today, mark_events_changed
+from extensions import db
+from migrations import migrate, setup_lock
+from models import (
+    AcademicEvent,
+    Course,
+    CourseBlock,
+    CourseMeeting,
+    CourseSection,
+    Program,
+    User,
+    UserCourseStatus,
+    UserScheduleEntry,
+)
+from progress import rebuild_progress
+from schedule_occupancy import section_mask
+from section_index import get_term_sections, mark_term_changed
+from seed_data import CURRENT_TERM, NEXT_TERM
+
+logger = logging.getLogger(__name__)
+
+PROGRAM_PREFIX = "SYN"
+EMAIL_DOMAIN = "synthetic.tec.ac.cr"
+DEFAULT_PASSWORD = "synthetic"
+
+FIELDS = (
+    "Administración de Empresas",
+    "Arquitectura y Urbanismo",
+    "Computación",
+    "Diseño Industrial",
+    "Ingeniería Agrícola",
+    "Ingeniería Ambiental",
+    "Ingeniería en Biotecnología",
+    "Ingeniería en Computadores",
+    "Ingeniería Electrónica",
+    "Ingeniería en Materiales",
+    "Ingeniería Forestal",
+    "Ingeniería Mecatrónica",
+    "Matemática",
+    "Producción Industrial",
+    "Seguridad Laboral e Higiene Ambiental",
+)
+SUBJECTS = (
+    "Álgebra",
+    "Cálculo",
+    "Comunicación Escrita",
+    "Estadística",
+    "Física",
+    "Fundamentos de Organización",
+    "Inglés",
+    "Laboratorio",
+    "Métodos Numéricos",
+    "Programación",
+    "Química",
+    "Seminario",
+    "Taller",
+    "Teoría",
+)
+FIRST_NAMES = (
+    "Ana", "Andrés", "Carlos", "Daniela", "Diego", "Fernanda", "Gabriel", "José",
+    "Laura", "Luis", "María", "Mariana", "Pablo", "Sofía", "Valeria", "Vanessa",
+)
+LAST_NAMES = (
+    "Alvarado", "Barrantes", "Castro", "Chaves", "Jiménez", "Mora", "Quesada",
+    "Ramírez", "Rodríguez", "Rojas", "Salas", "Solano", "Vargas", "Vega",
+)
+SEDES = ("Cartago", "San José", "San Carlos", "Limón", "Alajuela")
+DAYS = ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado")
+# TEC lecture slots; they do not fall on quarter hours.
+SLOTS = (
+    (clock(7, 30), clock(9, 20)),
+    (clock(9, 30), clock(11, 20)),
+    (clock(13, 0), clock(14, 50)),
+    (clock(15, 0), clock(16, 50)),
+    (clock(17, 0), clock(18, 50)),
+    (clock(18, 0), clock(20, 50)),
+)
+SEVERITIES = ("info", "warning", "danger")
+EVENT_TITLES = (
+    "Matrícula",
+    "Inclusiones",
+    "Retiro justificado",
+    "Semana de exámenes",
+    "Entrega de actas",
+    "Inscripción suficiencia",
+    "Feriado",
+)
+
+
+@dataclass
+class DatasetSpec:
+    seed: int = 1
+    programs: int = 20
+    blocks: int = 10
+    courses_per_block: int = 6
+    max_sections: int = 3
+    users: int = 100_000
+    events: int = 2_000
+    anchor_date: date = field(default_factory=date.today)
+    password: str = DEFAULT_PASSWORD
+    batch_size: int = 5_000
+
+
+@dataclass
+class DatasetResult:
+    programs: int = 0
+    courses: int = 0
+    sections: int = 0
+    meetings: int = 0
+    users: int = 0
+    statuses: int = 0
+    schedule_entries: int = 0
+    events: int = 0
+
+
+@dataclass
+class _CourseRow:
+    id: int
+    block_number: int
+
+
+@dataclass
+class _ProgramRow:
+    id: int
+    courses: List[_CourseRow]
+
+
+# Parents before children, so flushing in this order never breaks a foreign key.
+_WRITE_ORDER = (
+    Program,
+    CourseBlock,
+    Course,
+    CourseSection,
+    CourseMeeting,
+    User,
+    UserCourseStatus,
+    UserScheduleEntry,
+    AcademicEvent,
+)
+
+
+class _Ids:
+    """Hands out primary keys above the current maximum of each table."""
+
+    def __init__(self):
+        self._next: Dict[type, int] = {}
+
+    def take(self, model) -> int:
+        if model not in self._next:
+            current = db.session.execute(select(func.max(model.id))).scalar()
+            self._next[model] = (current or 0) + 1
+        value = self._next[model]
+        self._next[model] += 1
+        return value
+
+
+class _BatchWriter:
+    """Buffers rows per table; when one buffer fills, writes them all in ``_WRITE_ORDER``."""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self._rows: Dict[type, List[Dict]] = {model: [] for model in _WRITE_ORDER}
+
+    def add(self, model, row: Dict):
+        rows = self._rows[model]
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for model in _WRITE_ORDER:
+            rows = self._rows[model]
+            if rows:
+                db.session.execute(insert(model.__table__), rows)
+                self._rows[model] = []
+
+
+def _rng(spec: DatasetSpec, phase: str) -> random.Random:
+    # One stream per phase, so e.g. changing --users leaves the catalog unchanged.
+    return random.Random(f"{spec.seed}:{phase}")
+
+
+def _pick_requirements(rng: random.Random, earlier_blocks: Sequence[Sequence[str]]) -> List[str]:
+    """Zero to three prerequisites, mostly from the block right before."""
+    count = rng.choices((0, 1, 2, 3), weights=(15, 45, 30, 10))[0]
+    chosen: List[str] = []
+    for _ in range(count):
+        if rng.random() < 0.7:
+            pool = earlier_blocks[-1]
+        else:
+            pool = earlier_blocks[rng.randrange(len(earlier_blocks))]
+        code = rng.choice(pool)
+        if code not in chosen:
+            chosen.append(code)
+    return chosen
+
+
+def _generate_catalog(
+    spec: DatasetSpec, ids: _Ids, writer: _BatchWriter, result: DatasetResult
+) -> List[_ProgramRow]:
+    rng = _rng(spec, "catalog")
+    programs: List[_ProgramRow] = []
+
+    for program_index in range(spec.programs):
+        program = _ProgramRow(ids.take(Program), [])
+        block_ids: List[int] = []
+        block_codes: List[List[str]] = []
+        course_rows: List[Dict] = []
+
+        for block_number in range(1, spec.blocks + 1):
+            block_ids.append(ids.take(CourseBlock))
+            codes: List[str] = []
+            for position in range(1, spec.courses_per_block + 1):
+                code = f"SY{program_index + 1:04d}{len(course_rows) + 1:03d}"
+                credits = rng.choice((2, 3, 3, 4, 4))
+                requirements = _pick_requirements(rng, block_codes) if block_codes else []
+                corequisites = [rng.choice(codes)] if codes and rng.random() < 0.1 else []
+                course = _CourseRow(ids.take(Course), block_number)
+                course_rows.append(
+                    {
+                        "id": course.id,
+                        "program_id": program.id,
+                        "block_id": block_ids[-1],
+                        "code": code,
+                        "name": f"{rng.choice(SUBJECTS)} {block_number}.{position}",
+                        "credits": credits,
+                        "hours": credits + rng.randint(0, 2),
+                        "requisitos": ", ".join(requirements) or "No hay",
+                        "correquisitos": ", ".join(corequisites) or "No hay",
+                        "default_status": "not-coursed",
+                    }
+                )
+                program.courses.append(course)
+                codes.append(code)
+            block_codes.append(codes)
+
+        writer.add(
+            Program,
+            {
+                "id": program.id,
+                "code": f"{PROGRAM_PREFIX}{program_index + 1:03d}",
+                "name": f"{rng.choice(('Bachillerato', 'Licenciatura'))} en "
+                f"{rng.choice(FIELDS)} {program_index + 1}",
+                "jornada": rng.choice(("Diurna", "Nocturna")),
+                "sede_list": "|".join(sorted(rng.sample(SEDES, rng.randint(1, 3)))),
+                "degree": rng.choice(("Bachillerato", "Licenciatura")),
+                "last_updated": date(2020, 1, 1) + timedelta(days=rng.randrange(1500)),
+                "total_credits": sum(row["credits"] for row in course_rows),
+                "number_of_semesters": spec.blocks,
+            },
+        )
+        for block_number, block_id in enumerate(block_ids, start=1):
+            writer.add(
+                CourseBlock,
+                {"id": block_id, "program_id": program.id, "block_number": block_number},
+            )
+        for row in course_rows:
+            writer.add(Course, row)
+
+        programs.append(program)
+        result.programs += 1
+        result.courses += len(course_rows)
+
+    writer.flush()
+    return programs
+
+
+def _generate_sections(
+    spec: DatasetSpec,
+    programs: List[_ProgramRow],
+    ids: _Ids,
+    writer: _BatchWriter,
+    result: DatasetResult,
+) -> Dict[int, List[int]]:
+    """Sections and meetings for both terms; returns current-term section ids per course."""
+    rng = _rng(spec, "sections")
+    current_sections: Dict[int, List[int]] = {}
+
+    for term in (CURRENT_TERM, NEXT_TERM):
+        for program in programs:
+            for course in program.courses:
+                for number in range(1, rng.randint(1, spec.max_sections) + 1):
+                    section_id = ids.take(CourseSection)
+                    writer.add(
+                        CourseSection,
+                        {
+                            "id": section_id,
+                            "course_id": course.id,
+                            "term": term,
+                            "section_code": f"{number:02d}",
+                            "professor": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                            "location": f"{rng.choice('ABCDEFK')}{rng.randint(1, 9)}"
+                            f"-{rng.randint(1, 20)}",
+                        },
+                    )
+                    for day in rng.sample(DAYS, rng.choice((1, 2, 2))):
+                        start, end = rng.choice(SLOTS)
+                        writer.add(
+                            CourseMeeting,
+                            {
+                                "id": ids.take(CourseMeeting),
+                                "section_id": section_id,
+                                "day_of_week": day,
+                                "start_time": start,
+                                "end_time": end,
+                            },
+                        )
+                        result.meetings += 1
+                    if term == CURRENT_TERM:
+                        current_sections.setdefault(course.id, []).append(section_id)
+                    result.sections += 1
+        mark_term_changed(db.session, term)
+
+    writer.flush()
+    return current_sections
+
+
+def _course_status(rng: random.Random, block_number: int, current_block: int) -> str:
+    if block_number < current_block:
+        return rng.choices(("approved", "failed", "not-coursed"), weights=(90, 4, 6))[0]
+    if block_number == current_block:
+        return rng.choices(("in-progress", "not-coursed"), weights=(80, 20))[0]
+    return "not-coursed"
+
+
+def _generate_users(
+    spec: DatasetSpec,
+    programs: List[_ProgramRow],
+    current_sections: Dict[int, List[int]],
+    ids: _Ids,
+    writer: _BatchWriter,
+    result: DatasetResult,
+):
+    """Users spread over the programs and blocks, committed one batch at a time.
+
+    Each in-progress course gets a random current-term section that does not
+    clash with the user's others, or no schedule entry when every section does.
+    """
+    rng = _rng(spec, "users")
+    index = get_term_sections(CURRENT_TERM)
+    masks = {
+        section_id: section_mask(index.section(section_id))
+        for sections in current_sections.values()
+        for section_id in sections
+    }
+    # Every synthetic user shares one hash: hashing 100k passwords would dominate the run.
+    password_hash = generate_password_hash(
+        spec.password, current_app.config["PASSWORD_HASH_METHOD"]
+    )
+    now = datetime.utcnow()
+
+    for start in range(0, spec.users, spec.batch_size):
+        user_ids = []
+        for number in range(start, min(start + spec.batch_size, spec.users)):
+            program = programs[rng.randrange(len(programs))]
+            current_block = rng.randint(0, spec.blocks)
+            user_id = ids.take(User)
+            user_ids.append(user_id)
+            occupied = 0
+            writer.add(
+                User,
+                {
+                    "id": user_id,
+                    "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    "email": f"user{number + 1:06d}@{EMAIL_DOMAIN}",
+                    "password_hash": password_hash,
+                    "carne": f"S{number + 1:09d}",
+                    "program_id": program.id,
+                    "revision": 0,
+                    "created_at": now,
+                    "updated_at": now,
+                },
+            )
+            for course in program.courses:
+                status = _course_status(rng, course.block_number, current_block)
+                writer.add(
+                    UserCourseStatus,
+                    {
+                        "id": ids.take(UserCourseStatus),
+                        "user_id": user_id,
+                        "course_id": course.id,
+                        "status": status,
+                        "updated_at": now,
+                    },
+                )
+                result.statuses += 1
+                sections = current_sections.get(course.id)
+                if status != "in-progress" or not sections:
+                    continue
+                free = [section_id for section_id in sections if not masks[section_id] & occupied]
+                if not free:
+                    continue
+                section_id = rng.choice(free)
+                occupied |= masks[section_id]
+                writer.add(
+                    UserScheduleEntry,
+                    {
+                        "id": ids.take(UserScheduleEntry),
+                        "user_id": user_id,
+                        "section_id": section_id,
+                        "term": CURRENT_TERM,
+                        "is_current_term": True,
+                    },
+                )
+                result.schedule_entries += 1
+
+        writer.flush()
+        rebuild_progress(user_ids)
+        db.session.commit()
+        result.users += len(user_ids)
+        logger.info("Generated %d/%d synthetic users", result.users, spec.users)
+
+
+def _generate_events(
+    spec: DatasetSpec,
+    programs: List[_ProgramRow],
+    ids: _Ids,
+    writer: _BatchWriter,
+    result: DatasetResult,
+):
+    """Events from six months before to a year after the anchor date; one in ten is global."""
+    rng = _rng(spec, "events")
+    for _ in range(spec.events):
+        program_id = None if rng.random() < 0.1 else rng.choice(programs).id
+        writer.add(
+            AcademicEvent,
+            {
+                "id": ids.take(AcademicEvent),
+                "title": rng.choice(EVENT_TITLES),
+                "description": None,
+                "event_date": spec.anchor_date + timedelta(days=rng.randint(-180, 365)),
+                "severity": rng.choices(SEVERITIES, weights=(70, 20, 10))[0],
+                "program_id": program_id,
+            },
+        )
+        result.events += 1
+    writer.flush()
+    mark_events_changed(db.session)
+
+
+def _sync_sequences():
+    """Move PostgreSQL id sequences past the explicitly inserted ids."""
+    if db.session.get_bind().dialect.name != "postgresql":
+        return
+    for model in _WRITE_ORDER:
+        table = model.__tablename__
+        db.session.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+            )
+        )
+
+
+def generate_dataset(spec: DatasetSpec) -> DatasetResult:
+    """Write the dataset described by ``spec``; commits as it goes."""
+    existing = db.session.execute(
+        select(func.count()).select_from(Program).where(Program.code.like(f"{PROGRAM_PREFIX}%"))
+    ).scalar()
+    if existing:
+        raise click.ClickException(
+            f"{existing} synthetic program(s) already present; use a fresh database"
+        )
+
+    result = DatasetResult()
+    ids = _Ids()
+    writer = _BatchWriter(spec.batch_size)
+
+    programs = _generate_catalog(spec, ids, writer, result)
+    current_sections = _generate_sections(spec, programs, ids, writer, result)
+    _generate_events(spec, programs, ids, writer, result)
+    catalog.mark_catalog_changed(db.session)
+    db.session.commit()
+    logger.info(
+        "Generated %d programs, %d courses, %d sections, %d events",
+        result.programs,
+        result.courses,
+        result.sections,
+        result.events,
+    )
+
+    if programs:
+        _generate_users(spec, programs, current_sections, ids, writer, result)
+    _sync_sequences()
+    db.session.commit()
+    return result
+
+
+@click.command("generate-dataset")
+@click.option("--seed", default=DatasetSpec.seed, show_default=True)
+@click.option("--programs", default=DatasetSpec.programs, show_default=True)
+@click.option("--blocks", default=DatasetSpec.blocks, show_default=True)
+@click.option("--courses-per-block", default=DatasetSpec.courses_per_block, show_default=True)
+@click.option(
+    "--max-sections",
+    default=DatasetSpec.max_sections,
+    show_default=True,
+    help="Sections per course and term are drawn from 1..N.",
+)
+@click.option("--users", default=DatasetSpec.users, show_default=True)
+@click.option("--events", default=DatasetSpec.events, show_default=True)
+@click.option(
+    "--anchor-date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Date events are spread around (default: today).",
+)
+@click.option("--password", default=DEFAULT_PASSWORD, show_default=True)
+@click.option("--batch-size", default=DatasetSpec.batch_size, show_default=True)
+def generate_dataset_command(
+    seed: int,
+    programs: int,
+    blocks: int,
+    courses_per_block: int,
+    max_sections: int,
+    users: int,
+    events: int,
+    anchor_date: Optional[datetime],
+    password: str,
+    batch_size: int,
+):
+    """Generate a deterministic synthetic dataset for load and scaling tests."""
+    spec = DatasetSpec(
+        seed=seed,
+        programs=programs,
+        blocks=blocks,
+        courses_per_block=courses_per_block,
+        max_sections=max_sections,
+        users=users,
+        events=events,
+        anchor_date=anchor_date.date() if anchor_date else campus_today(),
+        password=password,
+        batch_size=batch_size,
+    )
+    started = time.perf_counter()
+    with setup_lock():
+        migrate()
+    try:
+        result = generate_dataset(spec)
+    except Exception:
+        db.session.rollback()
+        raise
+    elapsed = time.perf_counter() - started
+    logger.info("Generated synthetic dataset in %.2fs: %s", elapsed, result)
+    click.echo(
+        f"{result.programs} programs, {result.courses} courses, {result.sections} sections "
+        f"({result.meetings} meetings), {result.users} users ({result.statuses} statuses, "
+        f"{result.schedule_entries} schedule entries), {result.events} events "
+        f"in {elapsed:.2f}s (anchor date {spec.anchor_date.isoformat()})"
+    )
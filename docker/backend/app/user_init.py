@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from sqlalchemy import delete, func, insert, literal, select, true
+
+from extensions import db
+from models import Course, CourseSection, UserCourseStatus, UserScheduleEntry
+from progress import rebuild_progress
+
+
+def initialize_user_courses(user_id: int, program_id: int, term: str, with_schedule: bool = True):
+    """Create a user's default course statuses and current-term schedule.
+
+    Each part is one ``INSERT ... SELECT`` over ``courses`` / ``course_sections``,
+    so the cost does not grow with the number of courses in the program.
+    """
+    status_select = select(
+        literal(user_id),
+        Course.id,
+        func.coalesce(Course.default_status, "not-coursed"),
+        literal(datetime.utcnow()),
+    ).where(Course.program_id == program_id)
+    db.session.execute(
+        insert(UserCourseStatus).from_select(
+            ["user_id", "course_id", "status", "updated_at"],
+            status_select,
+        )
+    )
+
+    rebuild_progress([user_id])
+
+    if not with_schedule:
+        return
+
+    schedule_select = (
+        select(
+            literal(user_id),
+            CourseSection.id,
+            CourseSection.term,
+            true(),
+        )
+        .join(Course, CourseSection.course_id == Course.id)
+        .where(
+            Course.program_id == program_id,
+            Course.default_status == "in-progress",
+            CourseSection.term == term,
+        )
+        .order_by(CourseSection.id)
+    )
+    db.session.execute(
+        insert(UserScheduleEntry).from_select(
+            ["user_id", "section_id", "term", "is_current_term"],
+            schedule_select,
+        )
+    )
+
+
+def reset_user_courses(user_id: int, program_id: int, term: str):
+    """Drop a user's statuses and schedule, then initialize them for ``program_id``."""
+    db.session.execute(delete(UserScheduleEntry).where(UserScheduleEntry.user_id == user_id))
+    db.session.execute(delete(UserCourseStatus).where(UserCourseStatus.user_id == user_id))
+    initialize_user_courses(user_id, program_id, term)
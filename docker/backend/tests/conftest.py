@@ -0,0 +1,40 @@
+"""Shared fixtures: the app on its in-memory SQLite database, seeded at startup."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+
+# ``config.Config`` reads the environment once, at import time.
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+os.environ.pop("SQLITE_PATH", None)
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["EXPOSE_QUERY_COUNT"] = "true"
+# One process owns the database, so the shared generation never moves under it.
+os.environ["CACHE_GENERATION_CHECK_SECONDS"] = "3600"
+
+DEMO_EMAIL = "anthony@tec.ac.cr"
+DEMO_PASSWORD = "demo123"
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import create_app
+
+    return create_app()
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    response = client.post("/auth/login", json={"email": DEMO_EMAIL, "password": DEMO_PASSWORD})
+    assert response.status_code == 200, response.get_json()
+    return {"Authorization": f"Bearer {response.get_json()['token']}"}
@@ -0,0 +1,86 @@
+"""The secondary indexes added by schema migration 5 serve the hot filters.
+
+Builds a database at version 4 (the model indexes dropped), migrates it, fills it
+with a small synthetic dataset and checks SQLite's ``EXPLAIN QUERY PLAN`` searches
+each filter through its index instead of scanning the table.
+"""
+
+import re
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from extensions import db
+from migrations import SCHEMA_VERSION, _stamp, migrate
+from synthetic_data import DatasetSpec, generate_dataset
+
+# (filter, index that must serve it)
+INDEXED_FILTERS = [
+    (
+        "SELECT user_id FROM user_course_statuses WHERE course_id = :id",
+        "ix_user_course_statuses_course_id",
+    ),
+    (
+        "SELECT section_id FROM user_schedule_entries WHERE user_id = :id AND term = :term",
+        "ix_user_schedule_entries_user_term",
+    ),
+    (
+        "SELECT day_of_week FROM course_meetings WHERE section_id = :id",
+        "ix_course_meetings_section_id",
+    ),
+    ("SELECT code FROM courses WHERE program_id = :id", "ix_courses_program_id"),
+    ("SELECT code FROM courses WHERE block_id = :id", "ix_courses_block_id"),
+    (
+        "SELECT title FROM academic_events WHERE program_id = :id AND event_date >= :day "
+        "ORDER BY event_date",
+        "ix_academic_events_program_date",
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def migrated_app():
+    from app import create_app
+
+    # A second in-memory database, separate from the seeded one of ``app``.
+    app = create_app(initialize=False)
+    with app.app_context():
+        migrate()
+        # Roll back to the schema before migration 5 and apply it again.
+        for _, index_name in INDEXED_FILTERS:
+            db.session.execute(text(f"DROP INDEX {index_name}"))
+        _stamp(4)
+        db.session.commit()
+        assert migrate() == SCHEMA_VERSION
+
+        generate_dataset(
+            DatasetSpec(
+                programs=3,
+                blocks=4,
+                courses_per_block=4,
+                users=60,
+                events=60,
+                anchor_date=date(2026, 3, 2),
+                batch_size=100,
+            )
+        )
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+        yield app
+
+
+@pytest.mark.parametrize(
+    "sql, index_name", INDEXED_FILTERS, ids=[name for _, name in INDEXED_FILTERS]
+)
+def test_filter_uses_index(migrated_app, sql, index_name):
+    with migrated_app.app_context():
+        plan = db.session.execute(
+            text(f"EXPLAIN QUERY PLAN {sql}"),
+            {"id": 1, "term": "2026-I", "day": date(2026, 3, 2)},
+        ).all()
+    details = [row[-1] for row in plan]
+    assert any(
+        re.match(rf"SEARCH \w+ USING (COVERING )?INDEX {index_name} \(", detail)
+        for detail in details
+    ), details
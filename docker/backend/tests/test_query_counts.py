@@ -0,0 +1,79 @@
+"""Statements per request for the /users/me views.
+
+Each view loads its rows in a fixed number of queries however many courses,
+sections and meetings the user has; a count that grows again means an N+1 came
+back. Counts come from ``extensions.query_count()`` through ``X-SQL-Queries``.
+"""
+
+import itertools
+
+import pytest
+
+from extensions import db
+from models import User, UserScheduleEntry
+
+# Steady state for a student with a schedule: the first request of a process
+# also builds the in-memory catalog, section and event indexes.
+EXPECTED_QUERIES = {
+    "/users/me/course-status": 2,
+    "/users/me/curriculum": 3,
+    "/users/me/dashboard": 6,
+    "/users/me/schedule": 4,
+    "/users/me/bootstrap": 6,
+}
+
+_carnes = itertools.count(2099000001)
+
+
+def _sign_up(client):
+    carne = str(next(_carnes))
+    response = client.post(
+        "/auth/signup",
+        json={
+            "name": "Query Count",
+            "email": f"{carne}@estudiantec.cr",
+            "password": "secret123",
+            "programCode": "412",
+            "carne": carne,
+        },
+    )
+    assert response.status_code == 201, response.get_json()
+    session = response.get_json()
+    return session["user"]["id"], {"Authorization": f"Bearer {session['token']}"}
+
+
+def _query_count(client, path, headers):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return int(response.headers["X-SQL-Queries"])
+
+
+def _steady_query_count(client, path, headers):
+    _query_count(client, path, headers)
+    return _query_count(client, path, headers)
+
+
+@pytest.fixture(scope="module")
+def student(client):
+    return _sign_up(client)[1]
+
+
+@pytest.mark.parametrize("path, expected", sorted(EXPECTED_QUERIES.items()))
+def test_query_count(client, student, path, expected):
+    assert _steady_query_count(client, path, student) == expected
+
+
+def test_query_count_does_not_grow_with_rows(app, client):
+    user_id, headers = _sign_up(client)
+    before = {path: _steady_query_count(client, path, headers) for path in EXPECTED_QUERIES}
+
+    with app.app_context():
+        entries = UserScheduleEntry.query.filter_by(user_id=user_id).all()
+        assert len(entries) > 1
+        for entry in entries[1:]:
+            db.session.delete(entry)
+        User.bump_revision(user_id)
+        db.session.commit()
+
+    after = {path: _steady_query_count(client, path, headers) for path in EXPECTED_QUERIES}
+    assert after == before
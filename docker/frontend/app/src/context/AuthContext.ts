@@ -1,15 +1,18 @@
 import { createContext } from 'react';
-import { User } from '../shared/types';
+import { BootstrapResponse, User } from '../shared/types';
 
 export interface AuthContextType {
   user: User | null;
   token: string | null;
+  // First-screen data shared by the pages; null until loaded.
+  bootstrap: BootstrapResponse | null;
   isAuthenticated: boolean;
   isLoading: boolean;
   login: (email: string, password: string) => Promise<boolean>;
   signup: (name: string, email: string, password: string, programCode: string, carne: string) => Promise<boolean>;
   updateProfile: (name: string, programCode: string, carne: string) => Promise<boolean>;
   refreshUser: () => Promise<void>;
+  reloadBootstrap: () => Promise<void>;
   logout: () => void;
 }
 
@@ -1,6 +1,6 @@
-import React, { ReactNode, useCallback, useEffect, useMemo, useState } from "react";
-import { apiRequest, ApiError } from "../lib/api";
-import { User } from "../shared/types";
+import React, { ReactNode, useCallback, useEffect, useMemo, useRef, useState } from "react";
+import { apiRequest, ApiError, clearApiCache, setUnauthorizedHandler } from "../lib/api";
+import { BootstrapResponse, User } from "../shared/types";
 import { AuthContext } from "./AuthContext";
 import type { AuthContextType } from "./AuthContext";
 
@@ -9,8 +9,15 @@ interface AuthProviderProps {
 }
 
 const TOKEN_STORAGE_KEY = "tecplanning_token";
+const REFRESH_TOKEN_STORAGE_KEY = "tecplanning_refresh_token";
 const USER_STORAGE_KEY = "tecplanning_user";
 
+interface SessionResponse {
+  token: string;
+  refreshToken: string;
+  user: User;
+}
+
 const parseStoredUser = (): User | null => {
   const stored = localStorage.getItem(USER_STORAGE_KEY);
   if (!stored) {
@@ -27,36 +34,103 @@ const parseStoredUser = (): User | null => {
 export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   const [token, setToken] = useState<string | null>(null);
   const [user, setUser] = useState<User | null>(null);
+  const [bootstrap, setBootstrap] = useState<BootstrapResponse | null>(null);
   const [isLoading, setIsLoading] = useState(true);
 
-  const storeSession = useCallback((authToken: string, nextUser: User) => {
-    setToken(authToken);
-    setUser(nextUser);
-    localStorage.setItem(TOKEN_STORAGE_KEY, authToken);
-    localStorage.setItem(USER_STORAGE_KEY, JSON.stringify(nextUser));
+  const storeSession = useCallback((session: SessionResponse) => {
+    setToken(session.token);
+    setUser(session.user);
+    localStorage.setItem(TOKEN_STORAGE_KEY, session.token);
+    localStorage.setItem(REFRESH_TOKEN_STORAGE_KEY, session.refreshToken);
+    localStorage.setItem(USER_STORAGE_KEY, JSON.stringify(session.user));
   }, []);
 
   const clearSession = useCallback(() => {
     setToken(null);
     setUser(null);
+    setBootstrap(null);
     localStorage.removeItem(TOKEN_STORAGE_KEY);
+    localStorage.removeItem(REFRESH_TOKEN_STORAGE_KEY);
     localStorage.removeItem(USER_STORAGE_KEY);
+    clearApiCache();
+  }, []);
+
+  const renewal = useRef<Promise<string | null> | null>(null);
+
+  // Refresh tokens are single-use, so concurrent 401s share one renewal.
+  const renewSession = useCallback(
+    (rejectedToken: string): Promise<string | null> => {
+      const storedToken = localStorage.getItem(TOKEN_STORAGE_KEY);
+      if (storedToken && storedToken !== rejectedToken) {
+        // Already renewed, by an earlier 401 or another tab.
+        return Promise.resolve(storedToken);
+      }
+      if (!renewal.current) {
+        renewal.current = (async () => {
+          const refreshToken = localStorage.getItem(REFRESH_TOKEN_STORAGE_KEY);
+          try {
+            if (!refreshToken) {
+              throw new Error("No refresh token stored");
+            }
+            const session = await apiRequest<SessionResponse>("/auth/refresh", {
+              method: "POST",
+              body: JSON.stringify({ refreshToken }),
+            });
+            storeSession(session);
+            return session.token;
+          } catch (error) {
+            console.error("Session refresh failed", error);
+            clearSession();
+            return null;
+          } finally {
+            renewal.current = null;
+          }
+        })();
+      }
+      return renewal.current;
+    },
+    [clearSession, storeSession],
+  );
+
+  useEffect(() => {
+    setUnauthorizedHandler(renewSession);
+    return () => setUnauthorizedHandler(null);
+  }, [renewSession]);
+
+  // One request loads the profile and every page's first-screen data.
+  const loadBootstrap = useCallback(async (accessToken: string) => {
+    const payload = await apiRequest<BootstrapResponse>("/users/me/bootstrap", {
+      token: accessToken,
+    });
+    setBootstrap(payload);
+    setUser(payload.profile);
+    localStorage.setItem(USER_STORAGE_KEY, JSON.stringify(payload.profile));
   }, []);
 
+  const reloadBootstrap = useCallback(async () => {
+    if (!token) {
+      return;
+    }
+    try {
+      await loadBootstrap(token);
+    } catch (error) {
+      console.error("Failed to reload first-screen data", error);
+      throw error;
+    }
+  }, [token, loadBootstrap]);
+
   const refreshUser = useCallback(async () => {
     if (!token) {
       return;
     }
     try {
-      const profile = await apiRequest<User>("/users/me", { token });
-      setUser(profile);
-      localStorage.setItem(USER_STORAGE_KEY, JSON.stringify(profile));
+      await loadBootstrap(token);
     } catch (error) {
       console.error("Failed to refresh user profile", error);
       clearSession();
       throw error;
     }
-  }, [token, clearSession]);
+  }, [token, loadBootstrap, clearSession]);
 
   useEffect(() => {
     const storedToken = localStorage.getItem(TOKEN_STORAGE_KEY);
@@ -72,25 +146,25 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
       setUser(storedUser);
     }
 
-    apiRequest<User>("/users/me", { token: storedToken })
-      .then((profile) => {
-        setUser(profile);
-        localStorage.setItem(USER_STORAGE_KEY, JSON.stringify(profile));
-      })
+    loadBootstrap(storedToken)
       .catch((error) => {
+        // An expired access token has already been renewed by the 401 handler.
         console.error("Session validation failed", error);
         clearSession();
       })
       .finally(() => setIsLoading(false));
-  }, [clearSession]);
+  }, [clearSession, loadBootstrap]);
 
   const login = useCallback<AuthContextType["login"]>(async (email, password) => {
     try {
-      const response = await apiRequest<{ token: string; user: User }>("/auth/login", {
+      const response = await apiRequest<SessionResponse>("/auth/login", {
         method: "POST",
         body: JSON.stringify({ email, password }),
       });
-      storeSession(response.token, response.user);
+      storeSession(response);
+      loadBootstrap(response.token).catch((error) =>
+        console.error("Failed to load first-screen data", error),
+      );
       return true;
     } catch (error) {
       if (error instanceof ApiError && error.status === 401) {
@@ -99,16 +173,19 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
       console.error("Login error", error);
       return false;
     }
-  }, [storeSession]);
+  }, [storeSession, loadBootstrap]);
 
   const signup = useCallback<AuthContextType["signup"]>(
     async (name, email, password, programCode, carne) => {
       try {
-        const response = await apiRequest<{ token: string; user: User }>("/auth/signup", {
+        const response = await apiRequest<SessionResponse>("/auth/signup", {
           method: "POST",
           body: JSON.stringify({ name, email, password, programCode, carne }),
         });
-        storeSession(response.token, response.user);
+        storeSession(response);
+        loadBootstrap(response.token).catch((error) =>
+          console.error("Failed to load first-screen data", error),
+        );
         return true;
       } catch (error) {
         if (error instanceof ApiError && error.status === 409) {
@@ -118,7 +195,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
         return false;
       }
     },
-    [storeSession],
+    [storeSession, loadBootstrap],
   );
 
   const updateProfile = useCallback<AuthContextType["updateProfile"]>(
@@ -134,6 +211,10 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
         });
         setUser(updatedUser);
         localStorage.setItem(USER_STORAGE_KEY, JSON.stringify(updatedUser));
+        // A program change resets the curriculum, progress and schedule.
+        loadBootstrap(token).catch((error) =>
+          console.error("Failed to reload first-screen data", error),
+        );
         return true;
       } catch (error) {
         if (error instanceof ApiError && error.status === 409) {
@@ -143,24 +224,45 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
         return false;
       }
     },
-    [token],
+    [token, loadBootstrap],
   );
 
   const logout = useCallback(() => {
+    const refreshToken = localStorage.getItem(REFRESH_TOKEN_STORAGE_KEY);
+    if (refreshToken) {
+      // Best effort: the session is cleared locally either way.
+      apiRequest("/auth/logout", {
+        method: "POST",
+        body: JSON.stringify({ refreshToken }),
+      }).catch((error) => console.error("Logout request failed", error));
+    }
     clearSession();
   }, [clearSession]);
 
   const contextValue = useMemo<AuthContextType>(() => ({
     user,
     token,
+    bootstrap,
     isAuthenticated: Boolean(user && token),
     isLoading,
     login,
     signup,
     updateProfile,
     refreshUser,
+    reloadBootstrap,
+    logout,
+  }), [
+    user,
+    token,
+    bootstrap,
+    isLoading,
+    login,
+    signup,
+    updateProfile,
+    refreshUser,
+    reloadBootstrap,
     logout,
-  }), [user, token, isLoading, login, signup, updateProfile, refreshUser, logout]);
+  ]);
 
   return <AuthContext.Provider value={contextValue}>{children}</AuthContext.Provider>;
 };
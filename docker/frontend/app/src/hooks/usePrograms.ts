@@ -1,16 +1,19 @@
 import { useEffect, useState } from "react";
 import { apiRequest } from "../lib/api";
-import { ProgramSummary } from "../shared/types";
+import { Page, ProgramOption } from "../shared/types";
+
+// The pickers only render code and name, so request just those fields.
+const PROGRAMS_PATH = "/programs?fields=code,name&limit=200";
 
 interface UseProgramsResult {
-  programs: ProgramSummary[];
+  programs: ProgramOption[];
   isLoading: boolean;
   error: string | null;
   reload: () => Promise<void>;
 }
 
 export const usePrograms = (): UseProgramsResult => {
-  const [programs, setPrograms] = useState<ProgramSummary[]>([]);
+  const [programs, setPrograms] = useState<ProgramOption[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -18,8 +21,17 @@ export const usePrograms = (): UseProgramsResult => {
     setIsLoading(true);
     setError(null);
     try {
-      const data = await apiRequest<ProgramSummary[]>("/programs");
-      setPrograms(data);
+      const loaded: ProgramOption[] = [];
+      let cursor: string | null = null;
+      do {
+        const path: string = cursor
+          ? `${PROGRAMS_PATH}&cursor=${encodeURIComponent(cursor)}`
+          : PROGRAMS_PATH;
+        const page: Page<ProgramOption> = await apiRequest<Page<ProgramOption>>(path);
+        loaded.push(...page.items);
+        cursor = page.nextCursor;
+      } while (cursor);
+      setPrograms(loaded);
     } catch (err) {
       console.error("Failed to load programs", err);
       setError("No fue posible cargar los programas académicos");
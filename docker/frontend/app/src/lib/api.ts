@@ -17,8 +17,28 @@ const API_BASE =
 interface RequestOptions extends RequestInit {
   token?: string | null;
   skipJson?: boolean;
+  // Set on the retry after a renewal, so a second 401 is reported instead of looping.
+  skipRenewal?: boolean;
 }
 
+// Renews the session after a 401 on an authenticated request; resolves to the
+// new access token, or null when the user has to sign in again.
+type UnauthorizedHandler = (rejectedToken: string) => Promise<string | null>;
+
+let unauthorizedHandler: UnauthorizedHandler | null = null;
+
+export function setUnauthorizedHandler(handler: UnauthorizedHandler | null): void {
+  unauthorizedHandler = handler;
+}
+
+interface CachedResponse {
+  etag: string;
+  body: unknown;
+}
+
+// Last validated body per GET URL and token, revalidated with If-None-Match.
+const etagCache = new Map<string, CachedResponse>();
+
 const DEFAULT_HEADERS = {
   "Content-Type": "application/json",
   Accept: "application/json",
@@ -28,7 +48,7 @@ export async function apiRequest<T = unknown>(
   path: string,
   options: RequestOptions = {},
 ): Promise<T> {
-  const { token, skipJson, headers, ...rest } = options;
+  const { token, skipJson, skipRenewal, headers, ...rest } = options;
 
   const finalHeaders: Record<string, string> = {
     ...DEFAULT_HEADERS,
@@ -44,11 +64,29 @@ export async function apiRequest<T = unknown>(
     finalHeaders.Authorization = `Bearer ${token}`;
   }
 
+  const method = (rest.method ?? "GET").toUpperCase();
+  const cacheKey = method === "GET" && !skipJson ? `${token ?? ""} ${path}` : null;
+  const cached = cacheKey ? etagCache.get(cacheKey) : undefined;
+  if (cached) {
+    finalHeaders["If-None-Match"] = cached.etag;
+  }
+
   const response = await fetch(`${API_BASE}${path}`, {
     ...rest,
     headers: finalHeaders,
   });
 
+  if (response.status === 304 && cached) {
+    return cached.body as T;
+  }
+
+  if (response.status === 401 && token && !skipRenewal && unauthorizedHandler) {
+    const renewedToken = await unauthorizedHandler(token);
+    if (renewedToken) {
+      return apiRequest<T>(path, { ...options, token: renewedToken, skipRenewal: true });
+    }
+  }
+
   if (!response.ok) {
     let errorBody: unknown = null;
     try {
@@ -68,7 +106,16 @@ export async function apiRequest<T = unknown>(
     return undefined as T;
   }
 
-  return (await response.json()) as T;
+  const body = (await response.json()) as T;
+  const etag = response.headers.get("ETag");
+  if (cacheKey && etag) {
+    etagCache.set(cacheKey, { etag, body });
+  }
+  return body;
+}
+
+export function clearApiCache(): void {
+  etagCache.clear();
 }
 
 export function formatMeetingSchedule(
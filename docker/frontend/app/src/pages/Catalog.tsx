@@ -1,9 +1,8 @@
-import React, { useEffect, useMemo, useState } from "react";
+import React, { useMemo, useState } from "react";
 import FilterBar from "../components/FilterBar";
 import CourseCard from "../components/CourseCard";
 import { useAuth } from "../hooks/useAuth";
-import { apiRequest } from "../lib/api";
-import { CourseStatus, CurriculumResponse } from "../shared/types";
+import { CourseStatus } from "../shared/types";
 
 interface CatalogCourse {
   code: string;
@@ -23,39 +22,29 @@ const statusLabels: Record<CourseStatus, string> = {
 };
 
 const Catalog: React.FC = () => {
-  const { token } = useAuth();
-  const [courses, setCourses] = useState<CatalogCourse[]>([]);
+  const { bootstrap } = useAuth();
   const [searchQuery, setSearchQuery] = useState("");
-  const [isLoading, setIsLoading] = useState(false);
-  const [error, setError] = useState<string | null>(null);
+  const isLoading = bootstrap === null;
+  const error =
+    bootstrap !== null && bootstrap.curriculum === null
+      ? "No fue posible cargar el catálogo de cursos."
+      : null;
 
-  useEffect(() => {
-    if (!token) {
-      return;
-    }
-    setIsLoading(true);
-    setError(null);
-    apiRequest<CurriculumResponse>("/users/me/curriculum", { token })
-      .then((response) => {
-        const flattened: CatalogCourse[] = response.blocks.flatMap((block) =>
-          block.courses.map((course) => ({
-            code: course.code,
-            name: course.name,
-            credits: course.credits,
-            hours: course.hours,
-            requirements: course.requirements,
-            corequisites: course.corequisites,
-            status: course.status,
-          })),
-        );
-        setCourses(flattened);
-      })
-      .catch((err) => {
-        console.error("Failed to load catalog", err);
-        setError("No fue posible cargar el catálogo de cursos.");
-      })
-      .finally(() => setIsLoading(false));
-  }, [token]);
+  const courses = useMemo<CatalogCourse[]>(
+    () =>
+      (bootstrap?.curriculum?.blocks ?? []).flatMap((block) =>
+        block.courses.map((course) => ({
+          code: course.code,
+          name: course.name,
+          credits: course.credits,
+          hours: course.hours,
+          requirements: course.requirements,
+          corequisites: course.corequisites,
+          status: course.status,
+        })),
+      ),
+    [bootstrap],
+  );
 
   const filteredCourses = useMemo(() => {
     const query = searchQuery.trim().toLowerCase();
@@ -1,6 +1,8 @@
 import React, { useState } from "react";
 import { Check, X, Clock, HelpCircle, ChevronDown } from "lucide-react";
-import { programData } from "../data/programData";
+import { useAuth } from "../hooks/useAuth";
+import { apiRequest } from "../lib/api";
+import type { CourseStatus } from "../shared/types";
 
 const statusOptions = [
   {
@@ -25,28 +27,57 @@ const statusOptions = [
   },
 ];
 
-type CourseStatus = "not-coursed" | "in-progress" | "approved" | "failed";
-
 const Curriculum: React.FC = () => {
-  const [courseStatus, setCourseStatus] = useState<Record<string, CourseStatus>>(
-    programData.courses.reduce((acc, block) => {
-      block.courses.forEach((course) => {
-        acc[course.codigo] = course.status || "not-coursed";
-      });
-      return acc;
-    }, {} as Record<string, CourseStatus>),
-  );
+  const { token, bootstrap, reloadBootstrap } = useAuth();
+  // Statuses changed here and not yet reflected in the bootstrap payload.
+  const [pendingStatus, setPendingStatus] = useState<Record<string, CourseStatus>>({});
 
   const [openDropdown, setOpenDropdown] = useState<string | null>(null);
 
-  const updateCourseStatus = (courseCode: string, newStatus: CourseStatus) => {
-    setCourseStatus((prev) => ({
+  const updateCourseStatus = async (courseCode: string, newStatus: CourseStatus) => {
+    setPendingStatus((prev) => ({
       ...prev,
       [courseCode]: newStatus,
     }));
     setOpenDropdown(null);
+    try {
+      await apiRequest(`/users/me/course-status/${encodeURIComponent(courseCode)}`, {
+        method: "PUT",
+        body: JSON.stringify({ status: newStatus }),
+        token,
+      });
+      await reloadBootstrap();
+    } catch (error) {
+      console.error("Failed to update course status", error);
+    } finally {
+      setPendingStatus((prev) => {
+        const next = { ...prev };
+        delete next[courseCode];
+        return next;
+      });
+    }
   };
 
+  const curriculum = bootstrap?.curriculum;
+  if (!bootstrap || !curriculum) {
+    return (
+      <div className="max-w-6xl mx-auto">
+        <div className="animate-pulse">
+          <div className="h-8 bg-gray-200 rounded w-64 mb-2"></div>
+          <div className="h-4 bg-gray-200 rounded w-48 mb-6"></div>
+        </div>
+      </div>
+    );
+  }
+
+  const { program } = curriculum;
+  const courseStatus: Record<string, CourseStatus> = {};
+  curriculum.blocks.forEach((block) => {
+    block.courses.forEach((course) => {
+      courseStatus[course.code] = pendingStatus[course.code] ?? course.status;
+    });
+  });
+
   const getStatusColor = (status: CourseStatus) => {
     switch (status) {
       case "approved":
@@ -102,14 +133,7 @@ const Curriculum: React.FC = () => {
     }
   };
 
-  const completedCredits = programData.courses
-    .flatMap((block) => block.courses)
-    .filter((course) => courseStatus[course.codigo] === "approved")
-    .reduce((sum, course) => sum + course.creditos, 0);
-
-  const progressPercentage = Math.round(
-    (completedCredits / programData.total_credits) * 100,
-  );
+  const { completedCredits, progress: progressPercentage } = bootstrap.progress;
 
   return (
     <div className="max-w-6xl mx-auto">
@@ -117,10 +141,10 @@ const Curriculum: React.FC = () => {
         <h1 className="text-2xl font-bold mb-1">Malla Curricular</h1>
         <div className="flex flex-wrap gap-2 items-center">
           <p className="text-gray-600">
-            {programData.program} • Código: {programData.code} • {programData.grado_académico}
+            {program.name} • Código: {program.code} • {program.degree}
           </p>
           <div className="bg-blue-100 text-blue-800 text-xs px-2 py-1 rounded">
-            {completedCredits} de {programData.total_credits} créditos ({progressPercentage}%)
+            {completedCredits} de {program.totalCredits} créditos ({progressPercentage}%)
           </div>
         </div>
       </div>
@@ -130,19 +154,19 @@ const Curriculum: React.FC = () => {
         <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
           <div>
             <p className="text-sm">
-              <span className="font-medium">Jornada:</span> {programData.jornada}
+              <span className="font-medium">Jornada:</span> {program.jornada}
             </p>
             <p className="text-sm">
-              <span className="font-medium">Grado Académico:</span> {programData.grado_académico}
+              <span className="font-medium">Grado Académico:</span> {program.degree}
             </p>
             <p className="text-sm">
-              <span className="font-medium">Última Actualización:</span> {programData.última_actualización}
+              <span className="font-medium">Última Actualización:</span> {program.lastUpdated}
             </p>
           </div>
           <div>
             <p className="text-sm font-medium mb-1">Sedes:</p>
             <ul className="text-sm list-disc list-inside">
-              {programData.sedes.map((sede, index) => (
+              {program.sedes.map((sede, index) => (
                 <li key={index}>{sede}</li>
               ))}
             </ul>
@@ -165,42 +189,42 @@ const Curriculum: React.FC = () => {
       </div>
 
       <div className="grid grid-cols-1 md:grid-cols-3 gap-6">
-        {programData.courses
-          .filter((block) => block.bloque > 0)
+        {curriculum.blocks
+          .filter((block) => block.blockNumber > 0)
           .map((block) => (
-            <div key={block.bloque} className="bg-white border border-gray-200 rounded-lg overflow-hidden">
+            <div key={block.blockNumber} className="bg-white border border-gray-200 rounded-lg overflow-hidden">
               <div className="bg-gray-50 border-b border-gray-200 p-4">
-                <h2 className="font-semibold">Bloque {block.bloque}</h2>
+                <h2 className="font-semibold">Bloque {block.blockNumber}</h2>
               </div>
               <div className="divide-y divide-gray-200">
                 {block.courses.map((course) => (
                   <div
-                    key={course.codigo}
-                    className={`p-4 relative ${getStatusColor(courseStatus[course.codigo])}`}
+                    key={course.code}
+                    className={`p-4 relative ${getStatusColor(courseStatus[course.code])}`}
                   >
                     <div className="flex items-start">
                       <div className="mt-1 mr-3">
-                        {getStatusIcon(courseStatus[course.codigo])}
+                        {getStatusIcon(courseStatus[course.code])}
                       </div>
                       <div className="flex-1">
                         <div className="flex justify-between items-center">
                           <div>
                             <div className="font-semibold text-sm">
-                              {course.codigo}
+                              {course.code}
                             </div>
                             <div className="font-medium text-gray-800">
-                              {course.nombre}
+                              {course.name}
                             </div>
                           </div>
                           <div className="text-xs text-gray-500">
-                            {course.creditos} créditos • {course.horas} horas
+                            {course.credits} créditos • {course.hours} horas
                           </div>
                         </div>
                         <div className="text-xs text-gray-500 mt-1">
-                          <span className="font-medium">Requisitos:</span> {course.requisitos || "No hay"}
+                          <span className="font-medium">Requisitos:</span> {course.requirements || "No hay"}
                         </div>
                         <div className="text-xs text-gray-500">
-                          <span className="font-medium">Correquisitos:</span> {course.correquisitos || "No hay"}
+                          <span className="font-medium">Correquisitos:</span> {course.corequisites || "No hay"}
                         </div>
                         <div className="mt-3">
                           <button
@@ -208,20 +232,20 @@ const Curriculum: React.FC = () => {
                             className="text-xs text-blue-600 hover:text-blue-700 flex items-center gap-1"
                             onClick={() =>
                               setOpenDropdown((prev) =>
-                                prev === course.codigo ? null : course.codigo,
+                                prev === course.code ? null : course.code,
                               )
                             }
                           >
                             <span>Cambiar estado</span>
                             <ChevronDown size={12} />
                           </button>
-                          {openDropdown === course.codigo && (
+                          {openDropdown === course.code && (
                             <div className="mt-2 w-44 bg-white border border-gray-200 rounded-md shadow-lg">
                               {statusOptions.map((option) => (
                                 <button
                                   key={option.value}
                                   className="w-full text-left px-3 py-2 text-sm hover:bg-gray-50"
-                                  onClick={() => updateCourseStatus(course.codigo, option.value as CourseStatus)}
+                                  onClick={() => updateCourseStatus(course.code, option.value as CourseStatus)}
                                 >
                                   {option.label}
                                 </button>
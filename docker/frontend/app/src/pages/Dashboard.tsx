@@ -1,9 +1,10 @@
-import React, { useState } from "react";
+import React, { useMemo, useState } from "react";
 import ProgressStats from "../components/ProgressStats";
 import { Calendar } from "lucide-react";
 import ProfileEditModal from "../components/ProfileEditModal";
 import Button from "../components/ui/Button";
 import { useAuth } from "../hooks/useAuth";
+import { formatMeetingSchedule } from "../lib/api";
 
 const CurrentCoursesList: React.FC<{
   courses: {
@@ -77,11 +78,48 @@ const UpcomingEvents: React.FC<{
   </div>
 );
 
+const formatEventDate = (isoDate: string): string =>
+  new Date(`${isoDate}T00:00:00`).toLocaleDateString("es-CR", {
+    day: "numeric",
+    month: "short",
+  });
+
 const Dashboard: React.FC = () => {
-  const { user } = useAuth();
+  const { user, bootstrap } = useAuth();
   const [isEditModalOpen, setIsEditModalOpen] = useState(false);
 
-  if (!user) {
+  const currentCourses = useMemo(() => {
+    if (!bootstrap) {
+      return [];
+    }
+    const creditsByCode = new Map<string, number>();
+    for (const block of bootstrap.curriculum?.blocks ?? []) {
+      for (const course of block.courses) {
+        creditsByCode.set(course.code, course.credits);
+      }
+    }
+    return bootstrap.schedule
+      .filter((entry) => entry.isCurrentTerm)
+      .map((entry) => ({
+        code: entry.code,
+        name: entry.name,
+        credits: creditsByCode.get(entry.code) ?? 0,
+        schedule: formatMeetingSchedule(entry.meetings),
+        location: entry.location ?? "",
+      }));
+  }, [bootstrap]);
+
+  const upcomingEvents = useMemo(
+    () =>
+      (bootstrap?.events ?? []).map((event) => ({
+        date: formatEventDate(event.date),
+        name: event.title,
+        type: event.severity,
+      })),
+    [bootstrap],
+  );
+
+  if (!user || !bootstrap) {
     return (
       <div className="max-w-6xl mx-auto">
         <div className="animate-pulse">
@@ -92,84 +130,7 @@ const Dashboard: React.FC = () => {
     );
   }
 
-  const currentCourses = [
-    {
-      code: "IC6400",
-      name: "Investigación de operaciones",
-      credits: 4,
-      schedule: "K-J 17:00-18:50",
-      location: "B3-7",
-    },
-    {
-      code: "IC6600",
-      name: "Principios de sistemas operativos",
-      credits: 4,
-      schedule: "M-V 17:00-18:50",
-      location: "B3-1",
-    },
-    {
-      code: "IC7900",
-      name: "Computación y sociedad",
-      credits: 2,
-      schedule: "K-J 09:30-11:20",
-      location: "B3-8",
-    },
-    {
-      code: "IC8071",
-      name: "Seguridad del software",
-      credits: 3,
-      schedule: "M-V 09:30-11:20",
-      location: "B6-2",
-    },
-    {
-      code: "IC8073",
-      name: "Introducción a la realidad virtual",
-      credits: 3,
-      schedule: "K-J 13:00-14:50",
-      location: "",
-    },
-    {
-      code: "SE1222",
-      name: "Futbol sala",
-      credits: 0,
-      schedule: "V 13:00-14:50",
-      location: "",
-    },
-    {
-      code: "CS4402",
-      name: "Seminario de estudios costarricenses",
-      credits: 2,
-      schedule: "M 13:00-15:50",
-      location: "",
-    },
-  ];
-
-  const upcomingEvents: {
-    date: string;
-    name: string;
-    type: "info" | "warning" | "danger";
-  }[] = [
-    {
-      date: "6 Oct",
-      name: "Inscripción suficiencia",
-      type: "warning",
-    },
-    {
-      date: "21 Nov",
-      name: "Semana 16",
-      type: "info",
-    },
-    {
-      date: "11 Dic",
-      name: "Entrega de actas",
-      type: "danger",
-    },
-    {
-      date: "15 Dic",
-      name: "Matrícula V-2025",
-      type: "info",
-    },
-  ];
+  const { progress } = bootstrap;
 
   return (
     <div className="max-w-6xl mx-auto">
@@ -196,10 +157,10 @@ const Dashboard: React.FC = () => {
       />
 
       <ProgressStats
-        progress={68}
+        progress={progress.progress}
         gpa={94.7}
-        currentSemester={6}
-        timeRemaining={1}
+        currentSemester={progress.currentSemester}
+        timeRemaining={Math.ceil(progress.remainingSemesters / 2)}
       />
 
       <div className="grid grid-cols-1 md:grid-cols-3 gap-6">
@@ -1,4 +1,4 @@
-import React, { useEffect, useMemo, useState } from "react";
+import React, { useMemo, useState } from "react";
 import ScheduleBlock from "../components/ScheduleBlock";
 import {
   Search,
@@ -12,12 +12,10 @@ import {
 import ScheduleSuggestionModal from "../components/ScheduleSuggestionModal";
 import Button from "../components/ui/Button";
 import { useAuth } from "../hooks/useAuth";
-import { apiRequest } from "../lib/api";
 import type {
   CourseGroup,
   NextCourse,
   ScheduledCourse,
-  ScheduleEntry,
 } from "../shared/types";
 // Mock data for time slots
 const timeSlots = [
@@ -414,52 +412,38 @@ const recomputeConflicts = (courses: ScheduledCourse[]): ScheduledCourse[] => {
 
 
 const Schedule: React.FC = () => {
-  const { token } = useAuth();
+  const { token, bootstrap } = useAuth();
   const [planningSemester, setPlanningSemester] = useState("I-2025");
   const [searchQuery, setSearchQuery] = useState("");
   const [plannedCourses, setPlannedCourses] = useState<ScheduledCourse[]>([]);
-  const [currentCourses, setCurrentCourses] = useState<ScheduledCourse[]>([]);
-  const [currentTerm, setCurrentTerm] = useState<string | null>(null);
-  const [isLoadingCurrent, setIsLoadingCurrent] = useState(false);
-  const [scheduleError, setScheduleError] = useState<string | null>(null);
   const [showCurrentCourses, setShowCurrentCourses] = useState(true);
   const [isSuggestionModalOpen, setIsSuggestionModalOpen] = useState(false);
+  const isLoadingCurrent = Boolean(token) && bootstrap === null;
 
-  useEffect(() => {
-    if (!token) {
-      setCurrentCourses([]);
-      setCurrentTerm(null);
-      return;
-    }
-    setIsLoadingCurrent(true);
-    setScheduleError(null);
-    apiRequest<ScheduleEntry[]>("/users/me/schedule", { token })
-      .then((entries) => {
-        const mapped = entries.flatMap((entry, entryIndex) =>
-          entry.meetings.map((meeting, meetingIndex) => ({
-            id: `${entry.code}-${entry.section}-${entryIndex}-${meetingIndex}`,
-            code: entry.code,
-            name: entry.name,
-            professor: entry.professor,
-            day: meeting.day as ScheduledCourse["day"],
-            startTime: meeting.startTime,
-            endTime: meeting.endTime,
-            hasConflict: false,
-            isCurrent: true,
-            location: entry.location || "",
-          })),
-        );
-        setCurrentCourses(mapped);
-        setCurrentTerm(entries[0]?.term ?? null);
-      })
-      .catch((err) => {
-        console.error("Failed to load schedule", err);
-        setScheduleError("No fue posible cargar tu horario actual.");
-        setCurrentCourses([]);
-        setCurrentTerm(null);
-      })
-      .finally(() => setIsLoadingCurrent(false));
-  }, [token]);
+  const currentEntries = useMemo(
+    () => (bootstrap?.schedule ?? []).filter((entry) => entry.isCurrentTerm),
+    [bootstrap],
+  );
+  const currentTerm = currentEntries[0]?.term ?? null;
+
+  const currentCourses = useMemo<ScheduledCourse[]>(
+    () =>
+      currentEntries.flatMap((entry, entryIndex) =>
+        entry.meetings.map((meeting, meetingIndex) => ({
+          id: `${entry.code}-${entry.section}-${entryIndex}-${meetingIndex}`,
+          code: entry.code,
+          name: entry.name,
+          professor: entry.professor,
+          day: meeting.day as ScheduledCourse["day"],
+          startTime: meeting.startTime,
+          endTime: meeting.endTime,
+          hasConflict: false,
+          isCurrent: true,
+          location: entry.location || "",
+        })),
+      ),
+    [currentEntries],
+  );
 
   const addCourseToSchedule = (course: NextCourse, group: CourseGroup) => {
     const alreadyAdded =
@@ -539,9 +523,6 @@ const Schedule: React.FC = () => {
           {isLoadingCurrent && (
             <p className="text-xs text-gray-500 mt-2">Cargando cursos actuales...</p>
           )}
-          {scheduleError && (
-            <p className="text-xs text-red-600 mt-2">{scheduleError}</p>
-          )}
         </div>
         <div className="mt-3 md:mt-0 flex gap-2">
           <Button
@@ -102,6 +102,7 @@ export interface DashboardCourse {
   code: string;
   name: string;
   term: string;
+  isCurrentTerm: boolean;
   section: string;
   professor: string;
   location?: string | null;
@@ -122,6 +123,7 @@ export interface DashboardResponse {
   progress: DashboardProgress;
   currentCourses: DashboardCourse[];
   upcomingEvents: DashboardEvent[];
+  eligibleCourses?: string[];
 }
 
 export interface CurriculumCourse {
@@ -132,6 +134,7 @@ export interface CurriculumCourse {
   requirements?: string;
   corequisites?: string;
   status: CourseStatus;
+  eligible?: boolean;
 }
 
 export interface CurriculumBlock {
@@ -168,5 +171,21 @@ export interface ProgramSummary {
   numberOfSemesters?: number;
 }
 
+export type ProgramOption = Pick<ProgramSummary, "code" | "name">;
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
 export type ScheduleEntry = DashboardCourse;
+
+// GET /users/me/bootstrap: everything the first screen needs in one response.
+export interface BootstrapResponse {
+  profile: User;
+  progress: DashboardProgress;
+  curriculum: Omit<CurriculumResponse, "progress"> | null;
+  schedule: ScheduleEntry[];
+  events: DashboardEvent[];
+}
 }